@@ -1,4 +1,5 @@
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 from asciimatics.scene import Scene
 from asciimatics.screen import Screen
@@ -8,10 +9,10 @@ from asciimatics.renderers.images import ColourImageFile
 import rtrace
 from .scene_view import SceneView
 
-def main_app(screen: Screen, last_scene: Scene, rtrace_scene: rtrace.Scene, cam: rtrace.Camera):
+def main_app(screen: Screen, last_scene: Scene, rtrace_scene: rtrace.Scene, cam: rtrace.Camera, executor: ProcessPoolExecutor):
     
     scenes = [
-        Scene([SceneView(screen, rtrace_scene, cam, "images/__gui_temp__.png")], -1, "scene_view")
+        Scene([SceneView(screen, rtrace_scene, cam, "images/__gui_temp__.png", executor)], -1, "scene_view")
     ]
     
     screen.play(scenes, stop_on_resize=True, start_scene=last_scene)
@@ -23,10 +24,17 @@ def run():
     ])
     cam = rtrace.Camera(128, 16/9, rtrace.Point3(0, 0, 1.5), rtrace.Point3(0, 0, -1), samples=1, use_multiprocess=False)
     
+    # One render worker for the whole session, every resize rebuilds the
+    # views and they would each leave a worker process behind otherwise
+    executor = ProcessPoolExecutor(max_workers=1)
+    
     last_scene = None
-    while True:
-        try:
-            Screen.wrapper(main_app, arguments=[last_scene, rtrace_scene, cam])
-            sys.exit(0)
-        except ResizeScreenError as e:
-            last_scene = e.scene
\ No newline at end of file
+    try:
+        while True:
+            try:
+                Screen.wrapper(main_app, arguments=[last_scene, rtrace_scene, cam, executor])
+                sys.exit(0)
+            except ResizeScreenError as e:
+                last_scene = e.scene
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -1,5 +1,7 @@
 from __future__ import annotations
 import typing as t
+import io
+from concurrent.futures import ProcessPoolExecutor, Future
 
 from asciimatics.widgets import Frame, Widget, Button, Layout, Label, TextBox, ListBox, VerticalDivider, Divider, PopUpDialog, Text
 from asciimatics.renderers.images import ColourImageFile
@@ -13,10 +15,21 @@ if t.TYPE_CHECKING:
     from asciimatics.screen import Screen
     from ..rtrace import Scene, Camera
 
+# How many frames to wait between checks on a pending render
+_RENDER_POLL_FRAMES = 5
+
+
+def _render_to_bytes(camera: Camera, scene: Scene) -> bytes:
+    """Renders a scene in memory and returns the encoded PNG, used by the
+    worker process so previews never touch the disk"""
+    buf = io.BytesIO()
+    camera.render(scene, buf, silent=True)
+    return buf.getvalue()
+
 
 class SceneView(Frame):
     
-    def __init__(self, screen: Screen, scene: Scene, camera: Camera, render_fp: str):
+    def __init__(self, screen: Screen, scene: Scene, camera: Camera, render_fp: str, executor: ProcessPoolExecutor):
         super(SceneView, self).__init__(
             screen,
             screen.height,
@@ -30,6 +43,21 @@ class SceneView(Frame):
         self._render_scene = scene
         self._camera = camera
         self._render_image_path = render_fp
+        self._display_image_path = render_fp
+        
+        # The displayed image is read from disk once, or comes straight from
+        # a preview render, and its text version is only converted again
+        # when the view height changes
+        self._display_image: bytes | None = None
+        self._text_image: list[str] | None = None
+        self._text_image_height: int | None = None
+        
+        # Renders run in a worker process so the interface stays
+        # responsive, the pending future is polled in update(). The
+        # executor is owned by gui.run() and outlives resize rebuilds
+        self._executor = executor
+        self._pending_render: Future | None = None
+        self._render_status = Label("")
         
         # Idea is, we place a textbox and update its content each time we want to render
         self._scene_view = TextBox(
@@ -53,7 +81,8 @@ class SceneView(Frame):
         
         top_toolbar = Layout([1, 1, 1, 1, 1])
         self.add_layout(top_toolbar)
-        top_toolbar.add_widget(Button("Render Scene", on_click=self.render_image))
+        top_toolbar.add_widget(Button("Preview", on_click=self.preview_render), 0)
+        top_toolbar.add_widget(Button("Final Render", on_click=self.final_render), 1)
         
         render_layout = Layout([75,2,25], fill_frame=True)
         self.add_layout(render_layout)
@@ -74,9 +103,25 @@ class SceneView(Frame):
         
         bottom_toolbar = Layout([1, 1, 1, 1, 1])
         self.add_layout(bottom_toolbar)
+        bottom_toolbar.add_widget(self._render_status)
         
         self.fix()
         
+        # The view only shows a few dozen rows of text, so interactive
+        # renders use a cheap camera sized to the view instead of the full one
+        self._preview_camera = rtrace.Camera(
+            max(self._scene_view._w * 2, 1),
+            camera.aspect_ratio,
+            camera.center,
+            camera.lookat,
+            camera.upvec,
+            samples=1,
+            recursion_limit=4,
+            fov=camera.fov,
+            focus_dist=camera.focus_dist,
+            use_multiprocess=False
+        )
+        
         # --< Some widget specific cleanup >-- #
         # self._camera.img_width = self._scene_view._w
         # self._camera.img_height = self._scene_view._h
@@ -84,11 +129,35 @@ class SceneView(Frame):
     def on_load(self):
         self.update_render_view()
     
+    @property
+    def frame_update_count(self):
+        # Asciimatics only updates an idle frame when asked to,
+        # so keep polling for as long as a render is pending
+        if getattr(self, "_pending_render", None) is not None:
+            return _RENDER_POLL_FRAMES
+        return super(SceneView, self).frame_update_count
+    
+    def update(self, frame_no):
+        if self._pending_render is not None and self._pending_render.done():
+            self._finish_render()
+        super(SceneView, self).update(frame_no)
+    
     
     def update_render_view(self):
-        image = ColourImageFile(self.screen, self._render_image_path, self._scene_view._h, uni=True, dither=True)
-        text_image = image._images[0].split('\n')
-        self._scene_view.value = text_image
+        if self._display_image is None:
+            with open(self._display_image_path, "rb") as f:
+                self._display_image = f.read()
+            self._text_image = None
+        
+        # Converting an image to text is expensive, only
+        # do it when the image or the view has changed
+        height = self._scene_view._h
+        if self._text_image is None or self._text_image_height != height:
+            image = ColourImageFile(self.screen, io.BytesIO(self._display_image), height, uni=True, dither=True)
+            self._text_image = image._images[0].split('\n')
+            self._text_image_height = height
+        
+        self._scene_view.value = self._text_image
     
     def get_scene_assets(self) -> tuple[str, int]:
         str_list = []
@@ -96,17 +165,48 @@ class SceneView(Frame):
             str_list.append((asset.__class__.__name__, index))
         return str_list
     
-    def render_image(self):
-        self._camera.render(
-            self._render_scene,
-            self._render_image_path,
-            silent=True
-        )
+    def preview_render(self):
+        self.render_image(self._preview_camera)
+    
+    def final_render(self):
+        self.render_image(self._camera, self._render_image_path)
+    
+    def render_image(self, camera: Camera, fp: str | None = None):
+        """Starts rendering the scene in the worker process, to the file fp
+        or in memory when no path is given"""
+        # Only one render can be in flight at a time
+        if self._pending_render is not None:
+            return
+        
+        if fp is None:
+            self._pending_render = self._executor.submit(_render_to_bytes, camera, self._render_scene)
+        else:
+            self._pending_render = self._executor.submit(
+                camera.render,
+                self._render_scene,
+                fp,
+                silent=True
+            )
+            self._display_image_path = fp
+        self._render_status.text = "Rendering..."
+    
+    def _finish_render(self):
+        future, self._pending_render = self._pending_render, None
+        self._render_status.text = ""
+        
+        error = future.exception()
+        if error is not None:
+            self.show_warning_modal(f"Render failed: {error}")
+            return
+        
+        # In memory renders hand back the image, file renders are read on refresh
+        self._display_image = future.result()
+        self._text_image = None
         self.update_render_view()
     
     def on_asset_select(self):
         attr_list = []
-        for key, value in self._render_scene.assets[self._asset_list.value].__dict__.items():
+        for key, value in self._render_scene.assets[self._asset_list.value].get_attrs().items():
             if isinstance(value, rtrace.Point3) or isinstance(value, rtrace.Vector3):
                 value = f"({value.x}, {value.y}, {value.z})"
             attr_list.append(
@@ -118,28 +218,38 @@ class SceneView(Frame):
         self._object_attrs.options = attr_list
     
     def change_object_attr(self):
-        attr = self._render_scene.assets[self._asset_list.value].__dict__.get(self._object_attrs.value, None)
-        
-        w_list = [Text(str(self._object_attrs.value))]
-        func = self.update_object_attr
-        cast_as = attr.__class__
+        name = self._object_attrs.value
+        attr = getattr(self._render_scene.assets[self._asset_list.value], name, None)
         
-        if isinstance(attr, rtrace.Point3) or isinstance(attr, rtrace.Vector3):
+        # Only numbers and vectors can be typed in, everything
+        # else would need its own editor to be constructed
+        if isinstance(attr, rtrace.Vector3):
             w_list = [
-                Text("X", value = str(attr.x)),
-                Text("Y"),
-                Text("Z")
+                self._text_input("X", attr.x),
+                self._text_input("Y", attr.y),
+                self._text_input("Z", attr.z)
             ]
             func = self.update_object_point3
-            cast_as=str
+        elif isinstance(attr, (int, float)) and not isinstance(attr, bool):
+            w_list = [self._text_input(str(name), attr)]
+            func = self.update_object_attr
+        else:
+            self.show_warning_modal(f"'{name}' can not be edited")
+            return
         
         self._scene.add_effect(PopUpInput(
             self.screen, 
             w_list,
             self.wrap_update_object_attr(func),
-            cast_as=cast_as
+            cast_as=float
         ))
     
+    @staticmethod
+    def _text_input(label: str, value: t.Any) -> Text:
+        text = Text(label)
+        text.value = str(value)
+        return text
+    
     def wrap_update_object_attr(self, callback: t.Callable) -> None:
         def wrapper(values):
             callback(values)
@@ -147,15 +257,20 @@ class SceneView(Frame):
         return wrapper
     
     def update_object_attr(self, value):
-        self._render_scene.assets[self._asset_list.value].__dict__.__setitem__(
+        self._render_scene.set_asset_attr(
+            self._asset_list.value,
             self._object_attrs.value, 
             value[0]
         )
     
     def update_object_point3(self, values):
-        self._render_scene.assets[self._asset_list.value].__dict__.__setitem__(
-            self._object_attrs.value, 
-            rtrace.Point3(float(values[0]), float(values[1]), float(values[2]))
+        index, name = self._asset_list.value, self._object_attrs.value
+        # Keep the vector class of the attribute, a direction stays a Vector3
+        vec_cls = getattr(self._render_scene.assets[index], name).__class__
+        self._render_scene.set_asset_attr(
+            index,
+            name,
+            vec_cls(values[0], values[1], values[2])
         )
     
     def show_warning_modal(self, text: str) -> None:
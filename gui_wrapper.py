@@ -1,3 +1,5 @@
 import gui
 
-gui.run()
\ No newline at end of file
+# Protected Entry Point is Required for Multiprocessing
+if __name__ == '__main__':
+    gui.run()
\ No newline at end of file
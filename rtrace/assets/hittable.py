@@ -3,13 +3,13 @@ import typing as t
 
 from math import sqrt, inf, acos, atan2
 from math import pi as PI
-from random import choice
 
 from ..vec3 import Point3, Vector3
 
 if t.TYPE_CHECKING:
     from .materials import Material
     from ..ray import Ray
+    from ..bvh import FlatBVH
 
 # --< Dereferences >-- #
 dot: t.Callable[[Vector3, Vector3], float]   = Vector3.dot
@@ -18,9 +18,21 @@ cross: t.Callable[[Vector3, Vector3], Vector3] = Vector3.cross
 
 _TWO_PI = 2 * PI
 
+# Stands in for the reciprocal of a zero direction component, large
+# enough to push the slab out to infinity without ever producing a nan
+_INV_ZERO_DIRECTION = 1e300
+
+# Boxes are at least this thick on every axis, flat assets such as
+# axis aligned quads would otherwise have boxes with no volume
+_MIN_BOX_SIZE = 1e-4
+
 
 # --< Utility Classes >-- #
 class Interval:
+    
+    # Fixed storage, intervals and boxes are read on every hit test
+    __slots__ = ("min", "max")
+    
     min: float
     max: float
     
@@ -89,7 +101,7 @@ class Interval:
             Interval: A new interval expanded by delta
         """
         padding = delta / 2
-        return Interval(self.min - padding, self.max - padding)
+        return Interval(self.min - padding, self.max + padding)
     
     @classmethod
     def empty(cls) -> Interval:
@@ -111,10 +123,19 @@ class Interval:
     
     @classmethod
     def from_intervals(cls, a: Interval, b: Interval) -> Interval:
-        return cls(min(a.min, b.min), max(a.max, b.max))
+        # Compared directly, every box merge of a BVH build passes through here
+        # and the min() and max() builtins cost more than the comparison
+        return cls(
+            a.min if a.min <= b.min else b.min,
+            a.max if a.max >= b.max else b.max
+        )
 
 class HitRecord(object):
     
+    # Records are reused across hit calls, fixed storage keeps
+    # copying between them to a handful of attribute writes
+    __slots__ = ("p", "normal", "mat", "t", "u", "v", "front_face")
+    
     p: Point3
     normal: Vector3
     mat: Material
@@ -129,6 +150,8 @@ class HitRecord(object):
         self.normal = None
         self.mat = None
         self.t = None
+        self.u = None
+        self.v = None
         self.front_face = None
     
     def copy_data(self, rec: HitRecord) -> t.NoReturn:
@@ -137,7 +160,13 @@ class HitRecord(object):
         Args:
             rec (HitRecord): Hit record to copy from
         """
-        self.__dict__.update(rec.__dict__)
+        self.p = rec.p
+        self.normal = rec.normal
+        self.mat = rec.mat
+        self.t = rec.t
+        self.u = rec.u
+        self.v = rec.v
+        self.front_face = rec.front_face
     
     def set_face_normal(self, r: Ray, outward_normal: Vector3) -> t.NoReturn:
         """Sets the face normal for this object
@@ -146,8 +175,9 @@ class HitRecord(object):
             r (Ray): The ray that intersects an object
             outward_normal (Vector3): The outward normal at the point of intersection
         """
-        self.front_face = Vector3.dot(r.direction, outward_normal) < 0
-        self.normal = outward_normal if self.front_face else (-1 * outward_normal)
+        direction = r.direction
+        self.front_face = ((direction.x * outward_normal.x) + (direction.y * outward_normal.y) + (direction.z * outward_normal.z)) < 0
+        self.normal = outward_normal if self.front_face else -outward_normal
     
     def bounding_box(self) -> None:
         """Returns the calculated bounding box to simplify optimizations
@@ -162,7 +192,22 @@ class HitRecord(object):
 
 # --< Hittable Assets >-- #
 class Hittable(object):
-    """The base hittable class for assets in a scene to inherit from"""
+    """The base hittable class for assets in a scene to inherit from
+    
+    Assets cache values derived from their attributes, such as their bounding box,
+    and scenes compile their assets once before rendering. Attributes changed with
+    set_attr() or Scene.set_asset_attr() are kept up to date, after assigning an
+    attribute directly call refresh() on the asset and Scene.invalidate() on its scene
+    """
+    
+    # Subclasses list their own attributes in __slots__ as well, large
+    # models hold many assets and slotted attributes are faster to read
+    __slots__ = ("center", "bbox")
+    
+    # Attributes computed from the others by refresh() or construction,
+    # get_attrs() leaves them out as editing them would be overwritten.
+    # Subclasses list only the names they add
+    _derived_attrs: tuple[str, ...] = ("bbox",)
     
     center: Point3
     bbox: AABB
@@ -192,9 +237,48 @@ class Hittable(object):
     
     def bounding_box(self) -> AABB:
         return self.bbox
+    
+    def get_attrs(self) -> dict[str, t.Any]:
+        """Returns the set attributes of this object that describe it by name, 
+        private and derived attributes are left out. Slotted objects have no 
+        __dict__ to read them from
+
+        Returns:
+            dict[str, t.Any]: The attributes of this object
+        """
+        mro = type(self).__mro__
+        derived = set()
+        for cls in mro:
+            derived.update(cls.__dict__.get("_derived_attrs", ()))
+        
+        attrs = {}
+        for cls in reversed(mro):
+            for name in cls.__dict__.get("__slots__", ()):
+                if hasattr(self, name):
+                    attrs[name] = getattr(self, name)
+        attrs.update(getattr(self, "__dict__", {}))
+        return {name: value for name, value in attrs.items() if not (name.startswith("_") or name in derived)}
+    
+    def set_attr(self, name: str, value: t.Any) -> None:
+        """Sets an attribute of this object and recomputes every value derived from it
+
+        Args:
+            name (str): The name of the attribute
+            value (t.Any): The new value of the attribute
+        """
+        setattr(self, name, value)
+        self.refresh()
+    
+    def refresh(self) -> None:
+        """Recomputes the values derived from the attributes of this object,
+        subclasses that cache data from their attributes must override this
+        """
+        ...
 
 class AABB:
     """Represents an Axis-Aligned Bounding Box (AABB)"""
+    __slots__ = ("x", "y", "z")
+    
     x: Interval
     y: Interval
     z: Interval
@@ -210,6 +294,17 @@ class AABB:
         self.x = x
         self.y = y
         self.z = z
+        self.pad_to_minimums()
+    
+    def pad_to_minimums(self) -> None:
+        """Expands any axis thinner than the minimum box size, a ray grazing
+        a box with no thickness could otherwise be counted as missing it"""
+        if self.x.size() < _MIN_BOX_SIZE:
+            self.x = self.x.expand(_MIN_BOX_SIZE)
+        if self.y.size() < _MIN_BOX_SIZE:
+            self.y = self.y.expand(_MIN_BOX_SIZE)
+        if self.z.size() < _MIN_BOX_SIZE:
+            self.z = self.z.expand(_MIN_BOX_SIZE)
     
     @classmethod
     def from_points(cls, a: Point3, b: Point3) -> AABB:
@@ -236,79 +331,207 @@ class AABB:
             Interval.from_intervals(box0.z, box1.z),
         )
     
-    def _axis_interval(self, r: Ray) -> t.Generator[Interval, Vector3, Point3]:
-        """Creates axis aligned pairs from Interval and a ray
+    def hit(self, r: Ray, ray_t: Interval) -> bool:
+        """Returns True if Ray r passes through this box within the interval ray_t,
+        boxes with no thickness on an axis can still be hit
 
         Args:
-            r (Ray): The ray to target
+            r (Ray): The ray to check
+            ray_t (Interval): The interval for valid hits
 
-        Yields:
-            Iterator[t.Generator[Interval, Vector3, Point3]]: Axis aligned pairs
+        Returns:
+            bool: If the box was hit
         """
-        orig = r.origin
-        r_dir = r.direction
-        for pair in [(self.x, r_dir.x, orig.x), (self.y, r_dir.y, orig.y), (self.z, r_dir.z, orig.z)]:
-            yield pair
-    
-    def hit(self, r: Ray, ray_t: Interval) -> bool:
+        origin, direction = r.origin, r.direction
+        t_enter, t_exit = ray_t.min, ray_t.max
+        
+        # Slab test, each axis narrows the distances the ray is within the box
+        inv_d = (1.0 / direction.x) if direction.x else _INV_ZERO_DIRECTION
+        t0, t1 = (self.x.min - origin.x) * inv_d, (self.x.max - origin.x) * inv_d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+        if t1 < t_exit:
+            t_exit = t1
+        if t_exit < t_enter:
+            return False
+        
+        inv_d = (1.0 / direction.y) if direction.y else _INV_ZERO_DIRECTION
+        t0, t1 = (self.y.min - origin.y) * inv_d, (self.y.max - origin.y) * inv_d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+        if t1 < t_exit:
+            t_exit = t1
+        if t_exit < t_enter:
+            return False
         
-        for ax, adinv, orig in self._axis_interval(r):
+        inv_d = (1.0 / direction.z) if direction.z else _INV_ZERO_DIRECTION
+        t0, t1 = (self.z.min - origin.z) * inv_d, (self.z.max - origin.z) * inv_d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+        if t1 < t_exit:
+            t_exit = t1
+        return t_enter <= t_exit
             
-            if not adinv:
-                adinv = 1.0 / adinv
 
-            t0, t1 = ((ax.min - orig) * adinv), ((ax.max - orig) * adinv)
-            
-            ray_t_min = min(ray_t.min, t0, t1)
-            ray_t_max = max(ray_t.max, t0, t1)
-            
-            if ray_t_max <= ray_t_min:
-                return False
-        return True
-            
+# --< BVH Construction >-- #
+# Twice the center of an assets box along each axis, only used to order assets
+def _centroid_x(asset: Hittable) -> float:
+    return asset.bbox.x.min + asset.bbox.x.max
+
+def _centroid_y(asset: Hittable) -> float:
+    return asset.bbox.y.min + asset.bbox.y.max
+
+def _centroid_z(asset: Hittable) -> float:
+    return asset.bbox.z.min + asset.bbox.z.max
+
+_CENTROID_KEYS = (_centroid_x, _centroid_y, _centroid_z)
+
+def _widest_centroid_axis(assets: list[Hittable]) -> int:
+    """Finds the axis the centers of the assets boxes are spread the furthest along
+
+    Args:
+        assets (list[Hittable]): The assets to check
+
+    Returns:
+        int: The axis, 0 x, 1 y, 2 z
+    """
+    # One pass over the boxes for all three axes, centers are left doubled
+    min_x = min_y = min_z = inf
+    max_x = max_y = max_z = -inf
+    for asset in assets:
+        box = asset.bbox
+        cx, cy, cz = box.x.min + box.x.max, box.y.min + box.y.max, box.z.min + box.z.max
+        if cx < min_x: min_x = cx
+        if cx > max_x: max_x = cx
+        if cy < min_y: min_y = cy
+        if cy > max_y: max_y = cy
+        if cz < min_z: min_z = cz
+        if cz > max_z: max_z = cz
+    
+    spans = (max_x - min_x, max_y - min_y, max_z - min_z)
+    return spans.index(max(spans))
+
+def _sah_split(assets: list[Hittable]) -> int:
+    """Picks where to split an ordered list of assets using the surface area heuristic,
+    the cost of a split is the area of each side's bounds times the assets on that side
+
+    Args:
+        assets (list[Hittable]): At least two assets, ordered along the split axis
+
+    Returns:
+        int: The index of the first asset on the right side
+    """
+    count = len(assets)
+    boxes = [asset.bbox for asset in assets]
+    
+    # Sweep from the right, saving the area of the bounds of every suffix
+    right_area = [0.0] * count
+    min_x = min_y = min_z = inf
+    max_x = max_y = max_z = -inf
+    for i in range(count - 1, 0, -1):
+        box = boxes[i]
+        x, y, z = box.x, box.y, box.z
+        if x.min < min_x: min_x = x.min
+        if x.max > max_x: max_x = x.max
+        if y.min < min_y: min_y = y.min
+        if y.max > max_y: max_y = y.max
+        if z.min < min_z: min_z = z.min
+        if z.max > max_z: max_z = z.max
+        dx, dy, dz = max_x - min_x, max_y - min_y, max_z - min_z
+        right_area[i] = (dx * dy) + (dy * dz) + (dz * dx)
+    
+    # Then from the left, comparing each split against the best so far.
+    # Even costs prefer the split nearer the middle to keep the tree shallow
+    best, best_cost = count // 2, inf
+    min_x = min_y = min_z = inf
+    max_x = max_y = max_z = -inf
+    for i in range(1, count):
+        box = boxes[i - 1]
+        x, y, z = box.x, box.y, box.z
+        if x.min < min_x: min_x = x.min
+        if x.max > max_x: max_x = x.max
+        if y.min < min_y: min_y = y.min
+        if y.max > max_y: max_y = y.max
+        if z.min < min_z: min_z = z.min
+        if z.max > max_z: max_z = z.max
+        dx, dy, dz = max_x - min_x, max_y - min_y, max_z - min_z
+        cost = (((dx * dy) + (dy * dz) + (dz * dx)) * i) + (right_area[i] * (count - i))
+        if cost < best_cost or (cost == best_cost and abs(count - (2 * i)) < abs(count - (2 * best))):
+            best, best_cost = i, cost
+    return best
+
 
 class BVHNode(Hittable):
     
+    __slots__ = ("left", "right", "axis", "bbox_hit")
+    _derived_attrs = ("axis", "bbox_hit")
+    
     left: Hittable
     right: Hittable
     
+    # The axis (0 x, 1 y, 2 z) the assets were ordered along
+    # before being split, left holds the lower assets
+    axis: int
+    
     # We save a whole hash step by saving the reference
     bbox_hit: t.Callable[[Ray, Interval], bool]
     
     def __init__(self, asset_list: list[Hittable], sort_assets: bool = True) -> None:
         """Creates a Bounding Volume Hierarchy that contains objects within bouding boxes
 
+        Assets are ordered by the center of their boxes along the axis those centers
+        are most spread out on, then split where the surface area heuristic estimates
+        the children are cheapest to traverse
+        
         Args:
-            asset_list (list[Hittable]): A list of assets to enclose
-            start (int, optional): The start index for tree generation. Defaults to 0.
-            end (int | None, optional): The end index for tree generation. Defaults to None.
+            asset_list (list[Hittable]): A list of assets to enclose, the list is reordered
+            sort_assets (bool, optional): Kept for older callers and ignored. Defaults to True.
         """
-        
-        comparator = choice([
-            lambda asset: asset.bbox.x.min,
-            lambda asset: asset.bbox.y.min,
-            lambda asset: asset.bbox.z.min,
-        ])
-        
-        object_span = len(asset_list)
-        
-        # Recursively create BVH Nodes until the entire space is filled
-        if object_span == 1:
-            self.left = self.right = asset_list[0]
-        elif object_span == 2:
-            self.left = asset_list[0]
-            self.right = asset_list[1]
-        else:
-            if sort_assets:
-                asset_list.sort(key = comparator)
-            # Refactor this to slice the asset_list list instead of passinng indexes
-            mid = (object_span // 2)
-            self.left = BVHNode(asset_list[:mid], sort_assets=False)
-            self.right = BVHNode(asset_list[mid:], sort_assets=False)
+        # The surface area heuristic always orders the assets to choose
+        # the split, so there is no longer an unsorted build to select
+        cls = self.__class__
+
+        # Nodes are split from a stack of pending work instead of recursing, uneven
+        # splits over large models can otherwise run past the recursion limit
+        nodes = []
+        pending = [(self, asset_list)]
+        while pending:
+            node, assets = pending.pop()
+            nodes.append(node)
+            object_span = len(assets)
+
+            if object_span == 1:
+                node.axis = 0
+                node.left = node.right = assets[0]
+                continue
+
+            node.axis = axis = _widest_centroid_axis(assets)
+            assets.sort(key = _CENTROID_KEYS[axis])
+            mid = _sah_split(assets)
+
+            if mid > 1:
+                node.left = cls.__new__(cls)
+                pending.append((node.left, assets[:mid]))
+            else:
+                node.left = assets[0]
+
+            if object_span - mid > 1:
+                node.right = cls.__new__(cls)
+                pending.append((node.right, assets[mid:]))
+            else:
+                node.right = assets[mid]
 
-        # Create a new bounding box for this object
-        self.bbox = AABB.from_box(self.left.bbox, self.right.bbox)
-        self.bbox_hit = self.bbox.hit
+        # Children are always split after their parent, so walking the nodes
+        # backwards gives every node its children's bounding boxes first
+        for node in reversed(nodes):
+            node.bbox = AABB.from_box(node.left.bbox, node.right.bbox)
+            node.bbox_hit = node.bbox.hit
     
     def __str__(self) -> str:
         return f"<BVH : [{self.left}|{self.right}]>"
@@ -319,12 +542,11 @@ class BVHNode(Hittable):
             return False
         
         hit_left = self.left.hit(r, ray_t, rec)
-        if_mul = int(hit_left)
         
+        # Picked rather than multiplied, an unbounded max times zero is nan
         hit_right = self.right.hit(r, Interval(
             ray_t.min, 
-            # A potentially faster multiplication
-            (rec.t * if_mul) + (ray_t.max * (1 - if_mul))
+            rec.t if hit_left else ray_t.max
         ), rec)
         
         return (hit_left or hit_right)
@@ -333,9 +555,26 @@ class BVHNode(Hittable):
 class HittableList(Hittable):
     """A contained list of hittable objects"""
     
+    # No __slots__, lists using a BVH replace their hit method per instance
+    _derived_attrs = ("bvh", "hit")
+    
     _use_bvh: bool
     assets: list[Hittable]
-    bvh: BVHNode | None
+    
+    # Rebuilt by finalize() the next time the list is hit after assets are added
+    bvh: FlatBVH | None
+    _bvh_dirty: bool
+    
+    # Spheres are kept as (sphere, center x, center y, center z, radius squared)
+    # records and quads as (quad, normal x y z, D, corner x y z, alpha axis x y z,
+    # beta axis x y z) records, both tested inline. Every other asset is asked through hit()
+    _spheres: list[tuple[Sphere, float, float, float, float]]
+    _quads: list[tuple[Quad, float, float, float, float, float, float, float, float, float, float, float, float, float]]
+    _others: list[Hittable]
+    
+    # Scratch records reused by every hit call instead of allocating new ones
+    _other_rec: HitRecord
+    _temp_rec: HitRecord
     
     def __init__(self, objects: list[Hittable] | None = None, *, use_bvh: bool = False):
         """A list of hittable objects, each object can be hit independently and reflection can hit each other object in the list
@@ -355,43 +594,162 @@ class HittableList(Hittable):
         super().__init__(Point3(0, 0, 0))
         
         self._use_bvh = use_bvh
+        self.bvh = None
+        self._bvh_dirty = use_bvh
         
         self.assets = []
+        self._spheres, self._quads, self._others = [], [], []
+        self._other_rec, self._temp_rec = HitRecord(), HitRecord()
         if objects is not None:
-            [self.add_asset(obj, suppress_bvh_updates=True) for obj in objects]
+            [self.add_asset(obj) for obj in objects]
             
         if use_bvh:
-            self.bvh = BVHNode(self.assets)
             self.hit = self._hit_bvh
     
-    def add_asset(self, asset: Hittable, *, suppress_bvh_updates = False) -> None:
+    def add_asset(self, asset: Hittable, *, suppress_bvh_updates: bool = False) -> None:
+        """Adds an asset to this list, lists using a BVH rebuild it the next time they are hit
+
+        Args:
+            asset (Hittable): The asset to add
+            suppress_bvh_updates (bool, optional): Kept for compatibility and has no effect, 
+                adding assets never rebuilds the BVH straight away. Defaults to False.
+        """
         if len(self.assets) < 1:
             self.center = asset.center
             self.bbox = asset.bbox
         self.assets.append(asset)
+        self._pack(asset)
         self.bbox = AABB.from_box(self.bbox, asset.bbox)
         
-        if self._use_bvh and not suppress_bvh_updates:
-            self.bvh = BVHNode(self.assets)
+        # Rebuilding after every asset is quadratic over a bulk load,
+        # the hierarchy is built once when it is next needed instead
+        self._bvh_dirty = self._use_bvh
+    
+    def finalize(self) -> None:
+        """Builds the BVH over the asset list if assets were added since it was last built,
+        hitting the list does this automatically but it can be called ahead of time after
+        adding many assets
+        """
+        if not self._bvh_dirty:
+            return
+        
+        # Imported here as the bvh module is built on this one
+        from ..bvh import FlatBVH
+        self.bvh = FlatBVH(self.assets)
+        self._bvh_dirty = False
+    
+    def _pack(self, asset: Hittable) -> None:
+        if isinstance(asset, Sphere):
+            center = asset.center
+            self._spheres.append((asset, center.x, center.y, center.z, asset.radius_sq))
+        elif isinstance(asset, Quad):
+            self._quads.append(_quad_record(asset))
+        else:
+            self._others.append(asset)
+    
+    def refresh(self) -> None:
+        self._spheres, self._quads, self._others = [], [], []
+        for asset in self.assets:
+            self._pack(asset)
+        
+        # Members may have moved or grown since they were added,
+        # the box is grown from them again the same way add_asset() does
+        if self.assets:
+            self.center = self.assets[0].center
+            self.bbox = self.assets[0].bbox
+            for asset in self.assets[1:]:
+                self.bbox = AABB.from_box(self.bbox, asset.bbox)
+        
+        self._bvh_dirty = self._use_bvh
     
     def hit(self, r: Ray, ray_t: Interval, rec: HitRecord) -> bool:
         
         if not self.bbox.hit(r, ray_t):
             return False
         
-        temp_rec = HitRecord()
-        hit_anything = False
+        ox, oy, oz = r.origin.x, r.origin.y, r.origin.z
+        dx, dy, dz = r.direction.x, r.direction.y, r.direction.z
+        a = (dx * dx) + (dy * dy) + (dz * dz)
+        t_min, closest = ray_t.min, ray_t.max
+        ahead = t_min >= 0.0
         
-        for asset in self.assets:
+        # The closest sphere is only written to the record once every asset is tested
+        closest_sphere = None
+        for sphere, cx, cy, cz, radius_sq in self._spheres:
+            ocx, ocy, ocz = cx - ox, cy - oy, cz - oz
+            h = (dx * ocx) + (dy * ocy) + (dz * ocz)
+            c = (ocx * ocx) + (ocy * ocy) + (ocz * ocz) - radius_sq
+            
+            # Starting outside a sphere behind the ray, both roots are negative
+            if h < 0.0 and c > 0.0 and ahead:
+                continue
+            
+            discriminant = (h * h) - (a * c)
+            if discriminant < 0:
+                continue
+            
+            sqrtd = sqrt(discriminant)
+            root = (h - sqrtd) / a
+            if not (t_min < root < closest):
+                root = (h + sqrtd) / a
+                if not (t_min < root < closest):
+                    continue
+            
+            closest = root
+            closest_sphere = sphere
+        
+        # Quads are tested the same way as Quad.hit, keeping the planar coordinates of the closest
+        closest_quad, quad_u, quad_v = None, 0.0, 0.0
+        for quad, nx, ny, nz, D, cx, cy, cz, ax, ay, az, bx, by, bz in self._quads:
+            denom = (nx * dx) + (ny * dy) + (nz * dz)
+            if -1e-8 < denom < 1e-8:
+                continue
+            
+            root = (D - ((nx * ox) + (ny * oy) + (nz * oz))) / denom
+            if not (t_min <= root <= closest):
+                continue
+            
+            hx, hy, hz = (ox + (root * dx)) - cx, (oy + (root * dy)) - cy, (oz + (root * dz)) - cz
+            alpha = (hx * ax) + (hy * ay) + (hz * az)
+            if not (0.0 <= alpha <= 1.0):
+                continue
+            beta = (hx * bx) + (hy * by) + (hz * bz)
+            if not (0.0 <= beta <= 1.0):
+                continue
+            
+            closest = root
+            closest_quad, quad_u, quad_v = quad, alpha, beta
+            closest_sphere = None
+        
+        # Other assets write to the scratch records, swapping them on each hit
+        # so the closest is only copied into rec once at the end
+        other_rec, temp_rec = self._other_rec, self._temp_rec
+        hit_other = False
+        
+        for asset in self._others:
+            ray_t.max = closest
             if asset.hit(r, ray_t, temp_rec):
-                hit_anything = True
-                ray_t.max = temp_rec.t
-                rec.copy_data(temp_rec) # Copy all data into temp_rec
+                hit_other = True
+                closest = temp_rec.t
+                closest_sphere = None
+                closest_quad = None
+                other_rec, temp_rec = temp_rec, other_rec
         
-        return hit_anything
+        if closest_sphere is not None:
+            closest_sphere.record_hit(r, closest, rec)
+        elif closest_quad is not None:
+            closest_quad.record_hit(r, closest, quad_u, quad_v, rec)
+        elif hit_other:
+            rec.copy_data(other_rec)
+        else:
+            return False
+        
+        ray_t.max = closest
+        return True
     
     def _hit_bvh(self, r: Ray, ray_t: Interval, rec: HitRecord) -> bool:
-        """An optional override for HittableList.hit that implements the structure for BVHNodes as the asset list
+        """An optional override for HittableList.hit that traverses a flattened BVH
+        over the asset list without recursion
 
         Args:
             r (Ray): _description_
@@ -401,12 +759,19 @@ class HittableList(Hittable):
         Returns:
             bool: _description_
         """
+        if self._bvh_dirty:
+            self.finalize()
         return self.bvh.hit(r, ray_t, rec)
 
 class Sphere(Hittable):
     """A hittable sphere with a radius"""
     
+    __slots__ = ("radius", "radius_sq", "inv_radius", "mat")
+    _derived_attrs = ("radius_sq", "inv_radius")
+    
     radius: float
+    radius_sq: float
+    inv_radius: float
     mat: Material
     
     def __init__(self, center: Point3, radius: float, mat: Material) -> None:
@@ -420,8 +785,17 @@ class Sphere(Hittable):
         self.radius = radius
         self.mat = mat
         
-        rvec = Point3(radius, radius, radius)
-        self.bbox = AABB.from_points(-rvec, rvec)
+        self.refresh()
+    
+    def refresh(self) -> None:
+        # Constants of the intersection math, saves a multiply
+        # per hit test and a division per recorded hit
+        self.center = self.center.as_floats
+        self.radius_sq = float(self.radius * self.radius)
+        self.inv_radius = 1.0 / self.radius if self.radius else 0.0
+        
+        rvec = Point3(self.radius, self.radius, self.radius)
+        self.bbox = AABB.from_points(self.center - rvec, self.center + rvec)
     
     def hit(self, r: Ray, ray_t: Interval, rec: HitRecord) -> bool:
         """Returns True if Ray r hits this sphere within the interval ray_t
@@ -435,14 +809,20 @@ class Sphere(Hittable):
         Returns:
             bool: If ray r hits this sphere
         """
-        
-        oc = self.center - r.origin
-        # This area could use some major performance boosts
+        # Worked on plain floats, vector math would create
+        # a new object for every intermediate value
+        center, origin, direction = self.center, r.origin, r.direction
+        ocx, ocy, ocz = center.x - origin.x, center.y - origin.y, center.z - origin.z
+        dx, dy, dz = direction.x, direction.y, direction.z
         
         # Calcualted values for quadratic
-        a = r.direction.length_squared
-        h = dot(r.direction, oc)
-        c = oc.length_squared - (self.radius * self.radius)
+        a = (dx * dx) + (dy * dy) + (dz * dz)
+        h = (dx * ocx) + (dy * ocy) + (dz * ocz)
+        c = (ocx * ocx) + (ocy * ocy) + (ocz * ocz) - self.radius_sq
+        
+        # Starting outside a sphere behind the ray, both roots are negative
+        if h < 0.0 and c > 0.0 and ray_t.min >= 0.0:
+            return False
         
         # Check if there are any zeros / intersections at all
         # using the first part of the quadratic formula?
@@ -451,25 +831,42 @@ class Sphere(Hittable):
             return False
         
         # Check to see if either calculated root is within the selected interval
+        # the interval checks are written out, calling surrounds() costs more than the compare
         sqrtd = sqrt(discriminant)
+        t_min, t_max = ray_t.min, ray_t.max
         root = (h - sqrtd) / a
-        if not ray_t.surrounds(root):
+        if not (t_min < root < t_max):
             root = (h + sqrtd) / a
-            if not ray_t.surrounds(root):
+            if not (t_min < root < t_max):
                 return False
         
+        self.record_hit(r, root, rec)
+        return True
+    
+    def record_hit(self, r: Ray, root: float, rec: HitRecord) -> None:
+        """Saves the data of a hit at distance root along Ray r to the hit record rec
+
+        Args:
+            r (Ray): The ray that hit this sphere
+            root (float): The distance along the ray of the hit
+            rec (HitRecord): HitRecord instance to save hit data to
+        """
+        # Calculated on plain floats, only the point and normal are made into vectors
+        origin, direction, center, inv_radius = r.origin, r.direction, self.center, self.inv_radius
+        dx, dy, dz = direction.x, direction.y, direction.z
+        px, py, pz = origin.x + (root * dx), origin.y + (root * dy), origin.z + (root * dz)
+        nx, ny, nz = (px - center.x) * inv_radius, (py - center.y) * inv_radius, (pz - center.z) * inv_radius
         
-        # Save data to hitrec
         rec.t = root
-        rec.p = r.at(root)
-        
-        outward_normal = (rec.p - self.center) / self.radius
-        rec.set_face_normal(r, outward_normal)
+        rec.p = Point3(px, py, pz)
+        rec.front_face = front_face = ((dx * nx) + (dy * ny) + (dz * nz)) < 0
+        rec.normal = Vector3(nx, ny, nz) if front_face else Vector3(-nx, -ny, -nz)
         rec.mat = self.mat
-        rec.u, rec.v = self.get_uv(outward_normal)
-        return True
-        
         
+        # The same as get_uv() on the outward normal
+        rec.u = (atan2(-nz, nx) + PI) / _TWO_PI
+        rec.v = acos(-ny) / PI
+    
     def get_uv(self, p: Point3) -> tuple[float, float]:
         theta = acos(-p.y)
         phi = atan2(-p.z, p.x) + PI
@@ -483,14 +880,21 @@ class Sphere(Hittable):
 class Quad(Hittable):
     """A flat quadrilateral object"""
     
+    __slots__ = ("mat", "u", "v", "w", "normal", "back_normal", "D", "alpha_axis", "beta_axis")
+    _derived_attrs = ("w", "normal", "back_normal", "D", "alpha_axis", "beta_axis")
+    
     mat: Material
     u: Vector3
     v: Vector3
     w: Vector3
     normal: Vector3
+    back_normal: Vector3
     D: float
     
-    _unit_contains = Interval(0, 1).contains
+    # alpha = hit . (v x w) and beta = hit . (w x u), for the hit point
+    # relative to the origin. Calculated by refresh()
+    alpha_axis: Vector3
+    beta_axis: Vector3
     
     
     def __init__(self, origin: Point3, u: Vector3, v: Vector3, mat: Material) -> None:
@@ -507,15 +911,10 @@ class Quad(Hittable):
         """
         super().__init__(origin)
         self.mat = mat
-        
-        n: Vector3 = cross(u, v)
         self.u = u
         self.v = v
-        self.w = n / dot(n, n)
-        self.normal = n.unit_vector
-        self.D = dot(self.normal, origin)
         
-        self.set_bounding_box()
+        self.refresh()
     
     @classmethod
     def Cube(cls, a: Point3, b: Point3, mat: Material) -> HittableList:
@@ -551,6 +950,17 @@ class Quad(Hittable):
     def Plane(cls) -> Quad:
         pass
     
+    def refresh(self) -> None:
+        n: Vector3 = cross(self.u, self.v)
+        self.w = n / dot(n, n)
+        self.normal = n.unit_vector
+        self.back_normal = -self.normal
+        self.D = dot(self.normal, self.center)
+        self.alpha_axis = cross(self.v, self.w).as_floats
+        self.beta_axis = cross(self.w, self.u).as_floats
+        
+        self.set_bounding_box()
+    
     def set_bounding_box(self) -> None:
         bbox_diagonal1 = AABB.from_points(self.center, self.center + self.u + self.v)
         bbox_diagonal2 = AABB.from_points(self.center + self.u, self.center + self.v)
@@ -558,50 +968,117 @@ class Quad(Hittable):
     
     def hit(self, r: Ray, ray_t: Interval, rec: HitRecord):
         normal = self.normal
+        nx, ny, nz = normal.x, normal.y, normal.z
+        ox, oy, oz = r.origin.x, r.origin.y, r.origin.z
+        dx, dy, dz = r.direction.x, r.direction.y, r.direction.z
         
-        denom = dot(normal, r.direction)
+        denom = (nx * dx) + (ny * dy) + (nz * dz)
         
         if abs(denom) < 1e-8:
             return False
         
-        t = (self.D - dot(normal, r.origin)) / denom
-        if not ray_t.contains(t):
+        t = (self.D - ((nx * ox) + (ny * oy) + (nz * oz))) / denom
+        if not (ray_t.min <= t <= ray_t.max):
             return False
         
-        intersection = r.at(t)
-        planar_hitpt_vector = intersection - self.center
-        alpha = dot(self.w, cross(planar_hitpt_vector, self.v))
-        beta = dot(self.w, cross(self.u, planar_hitpt_vector))
+        # The hit point relative to the corner of the quad
+        px, py, pz = ox + (t * dx), oy + (t * dy), oz + (t * dz)
+        hx, hy, hz = px - self.center.x, py - self.center.y, pz - self.center.z
+        
+        # The planar coordinates of the hit, w . (hit x v) and w . (u x hit)
+        # rearranged into dot products with the precalculated axes
+        alpha_axis, beta_axis = self.alpha_axis, self.beta_axis
+        alpha = (hx * alpha_axis.x) + (hy * alpha_axis.y) + (hz * alpha_axis.z)
+        beta = (hx * beta_axis.x) + (hy * beta_axis.y) + (hz * beta_axis.z)
         
         if not self._is_interior(alpha, beta, rec):
             return False
         
+        self.record_hit(r, t, alpha, beta, rec)
+        return True
+    
+    def record_hit(self, r: Ray, t: float, alpha: float, beta: float, rec: HitRecord) -> None:
+        """Saves the data of a hit at distance t along Ray r to the hit record rec
+
+        Args:
+            r (Ray): The ray that hit this quad
+            t (float): The distance along the ray of the hit
+            alpha (float): The planar coordinate of the hit along u
+            beta (float): The planar coordinate of the hit along v
+            rec (HitRecord): HitRecord instance to save hit data to
+        """
+        normal = self.normal
+        ox, oy, oz = r.origin.x, r.origin.y, r.origin.z
+        dx, dy, dz = r.direction.x, r.direction.y, r.direction.z
+        
+        # The normals of both faces are kept, the side the ray comes from picks one
+        front_face = ((normal.x * dx) + (normal.y * dy) + (normal.z * dz)) < 0
         rec.t = t
-        rec.p = intersection
+        rec.p = Point3(ox + (t * dx), oy + (t * dy), oz + (t * dz))
         rec.mat = self.mat
-        rec.set_face_normal(r, normal)
-
-        return True
+        rec.u, rec.v = alpha, beta
+        rec.front_face = front_face
+        rec.normal = normal if front_face else self.back_normal
     
     def _is_interior(self, a: float, b: float, rec: HitRecord) -> bool:
-        _unit_contains = self._unit_contains
-        if not _unit_contains(a) or not _unit_contains(b):
+        if not (0.0 <= a <= 1.0 and 0.0 <= b <= 1.0):
             return False
         
         rec.u, rec.v = a, b
         return True
 
 
+def _quad_record(quad: Quad) -> tuple[Quad, float, float, float, float, float, float, float, float, float, float, float, float, float]:
+    """Packs everything a ray test against a quad reads into one tuple of floats
+
+    Args:
+        quad (Quad): The quad to pack
+
+    Returns:
+        tuple: (quad, normal x y z, D, corner x y z, alpha axis x y z, beta axis x y z)
+    """
+    normal, corner = quad.normal, quad.center
+    alpha_axis, beta_axis = quad.alpha_axis, quad.beta_axis
+    return (
+        quad,
+        normal.x, normal.y, normal.z, quad.D,
+        float(corner.x), float(corner.y), float(corner.z),
+        alpha_axis.x, alpha_axis.y, alpha_axis.z,
+        beta_axis.x, beta_axis.y, beta_axis.z,
+    )
+
+
 class Triangle(Hittable):
     
+    __slots__ = ("vertices", "mat", "edge_1", "edge_2", "normal", "back_normal")
+    _derived_attrs = ("edge_1", "edge_2", "normal", "back_normal")
+    
     vertices: tuple[Point3,Point3,Point3]
     
-    _unit_contains = Interval(0, 1).contains
+    # Constant for every ray, calculated by refresh()
+    edge_1: Vector3
+    edge_2: Vector3
+    normal: Vector3
+    back_normal: Vector3
     
     def __init__(self, vertices: tuple[Point3,Point3,Point3], mat: Material):
         super().__init__(vertices[0])
         self.vertices = vertices
         self.mat = mat
+        
+        self.refresh()
+    
+    def refresh(self) -> None:
+        vertices = self.vertices
+        v0 = vertices[0].as_floats
+        self.edge_1 = vertices[1].as_floats - v0
+        self.edge_2 = vertices[2].as_floats - v0
+        
+        # Degenerate triangles have no normal, but are also never hit
+        normal = Vector3.cross(self.edge_1, self.edge_2)
+        self.normal = normal.unit_vector if normal.length_squared > 0 else normal
+        self.back_normal = -self.normal
+        
         self.bbox = AABB(
             Interval(
                 min(vertices[0].x, vertices[1].x, vertices[2].x),
@@ -618,38 +1095,56 @@ class Triangle(Hittable):
         )
     
     def hit(self, r: Ray, ray_t: Interval, rec: HitRecord) -> bool:
-        r_dir = r.direction
-        v0, v1, v2 = self.vertices
-        e1, e2 = v1 - v0, v2 - v0
+        # Moller-Trumbore on plain floats, the vectors are
+        # only created for the record once the triangle is hit
+        v0, e1, e2 = self.vertices[0], self.edge_1, self.edge_2
+        e1x, e1y, e1z = e1.x, e1.y, e1.z
+        e2x, e2y, e2z = e2.x, e2.y, e2.z
+        dx, dy, dz = r.direction.x, r.direction.y, r.direction.z
         
-        pvec = cross(r_dir, e2)
-        det = dot(pvec, e1)
+        # pvec = direction x e2
+        px, py, pz = (dy * e2z) - (dz * e2y), (dz * e2x) - (dx * e2z), (dx * e2y) - (dy * e2x)
+        det = (px * e1x) + (py * e1y) + (pz * e1z)
         if abs(det) < 1e-8:
             return False
         
         inv_det = 1.0 / det
         
-        tvec = r.origin - v0
-        u = dot(pvec, tvec) * inv_det
-        if not self._unit_contains(u):
+        tx, ty, tz = r.origin.x - v0.x, r.origin.y - v0.y, r.origin.z - v0.z
+        u = ((px * tx) + (py * ty) + (pz * tz)) * inv_det
+        if not (0.0 <= u <= 1.0):
             return False
         
-        qvec = cross(tvec, e1)
-        v = dot(qvec, r_dir) * inv_det
+        # qvec = tvec x e1
+        qx, qy, qz = (ty * e1z) - (tz * e1y), (tz * e1x) - (tx * e1z), (tx * e1y) - (ty * e1x)
+        v = ((qx * dx) + (qy * dy) + (qz * dz)) * inv_det
         if v < 0.0 or u + v > 1.0:
             return False
         
-        t = dot(e2, qvec) * inv_det
-        if not ray_t.contains(t):
+        t = ((e2x * qx) + (e2y * qy) + (e2z * qz)) * inv_det
+        if not (ray_t.min <= t <= ray_t.max):
             return False
         
+        self.record_hit(r, t, u, v, rec)
+        return True
+    
+    def record_hit(self, r: Ray, t: float, u: float, v: float, rec: HitRecord) -> None:
+        """Saves the data of a hit at distance t along Ray r to the hit record rec
+
+        Args:
+            r (Ray): The ray that hit this triangle
+            t (float): The distance along the ray of the hit
+            u (float): Barycentric coordinate of the hit along the first edge
+            v (float): Barycentric coordinate of the hit along the second edge
+            rec (HitRecord): HitRecord instance to save hit data to
+        """
+        origin, direction, normal = r.origin, r.direction, self.normal
         rec.t = t
-        rec.p = r.at(t)
+        rec.p = Point3(origin.x + (t * direction.x), origin.y + (t * direction.y), origin.z + (t * direction.z))
         rec.mat = self.mat
-        rec.set_face_normal(r, cross(e1, e2).unit_vector)
+        rec.front_face = front_face = ((direction.x * normal.x) + (direction.y * normal.y) + (direction.z * normal.z)) < 0
+        rec.normal = normal if front_face else self.back_normal
         rec.u, rec.v = u, v
-        
-        return True
 
 
 
@@ -662,41 +1157,58 @@ class Model(HittableList):
     
     @classmethod
     def from_obj(cls, fp: str, mat: Material) -> Model:
-        with open(fp, "r") as f:
-            data = f.read()
-        
-        vertex_str, faces_str = data.split("\n\n")[:2]
-        
+        """Loads a model from the vertices and faces of a Wavefront .obj file,
+        faces with more than three vertices are split into a fan of triangles
+
+        Args:
+            fp (str): Path to the .obj file
+            mat (Material): The material of every face
+
+        Raises:
+            ValueError: If a vertex or face line can not be read
+
+        Returns:
+            Model: The loaded model
+        """
         vertices = []
-        for triplet in vertex_str.split("\n"):
-            triplet = triplet.split(" ")
-            if not (len(triplet) == 4 or triplet[0] == "v"):
-                raise ValueError("Corrupted obj file")
-            
-            vertices.append(Point3(float(triplet[1]), float(triplet[2]), float(triplet[3])))
-        
         face_list = []
         
-        for face_triplet in faces_str.split("\n"):
-            face_triplet = face_triplet.split(" ")
-
-            if not (len(face_triplet) == 4 or face_triplet[0] == "f"):
-                raise ValueError("Corrupted obj file")
-            
-            x, y, z = int(face_triplet[1]) - 1, int(face_triplet[2]) - 1, int(face_triplet[3]) - 1
-            
-            face_list.append(Triangle([
-                vertices[x],
-                vertices[y],
-                vertices[z],
-            ], mat))
-            
+        # One pass over the lines, anything other than vertices and faces
+        # such as comments, normals and groups is skipped
+        with open(fp, "r") as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                
+                if parts[0] == "v":
+                    if len(parts) < 4:
+                        raise ValueError("Corrupted obj file")
+                    vertices.append(Point3(float(parts[1]), float(parts[2]), float(parts[3])))
+                
+                elif parts[0] == "f":
+                    if len(parts) < 4:
+                        raise ValueError("Corrupted obj file")
+                    
+                    # Faces index from 1, negative indexes count back from the last vertex,
+                    # only the vertex index before any "/" is used
+                    count = len(vertices)
+                    face = []
+                    for part in parts[1:]:
+                        index = int(part.split("/", 1)[0])
+                        face.append(vertices[index - 1 if index > 0 else count + index])
+                    
+                    for i in range(1, len(face) - 1):
+                        face_list.append(Triangle([face[0], face[i], face[i + 1]], mat))
+        
         return cls(face_list, mat)
 
 
 
 class ConstantMedium(Hittable):
     
+    __slots__ = ("boundary", "neg_inv_density", "phase_function")
+    
     boundary: Hittable
     neg_inv_density: float
     phase_function: t.Callable
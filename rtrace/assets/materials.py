@@ -2,6 +2,7 @@ from __future__ import annotations
 import typing as t
 
 from math import sqrt
+from random import uniform
 
 from ..vec3 import Vector3
 from ..color import Color
@@ -13,13 +14,29 @@ if t.TYPE_CHECKING:
     from .hittable import HitRecord
     from ..ray import Ray
 
-dot = Vector3.dot
-reflect = Vector3.reflect
-refract = Vector3.refract
+def _random_unit_floats() -> tuple[float, float, float]:
+    """The same as Vector3.random_unit_vector() but returns the components
+    as floats, scatter math is done without temporary vectors
+
+    Returns:
+        tuple[float, float, float]: A random direction with a length of 1
+    """
+    while True:
+        x, y, z = uniform(-1, 1), uniform(-1, 1), uniform(-1, 1)
+        lensq = (x * x) + (y * y) + (z * z)
+        if 1e-160 < lensq and lensq <= 1:
+            length = sqrt(lensq)
+            return x / length, y / length, z / length
 
 class Material(object):
     """The base class for a Material"""
     
+    # Flags read by the bounce loop to skip calls that do nothing, a material
+    # that can emit light must set emits and one whose scatter() always
+    # returns False may clear scatters
+    emits: bool = False
+    scatters: bool = True
+    
     def __init__(self) -> None:
         """Creates a base material without color that does not reflect"""
         ...
@@ -50,7 +67,7 @@ class Material(object):
         Returns:
             Color: The amount of emitted light
         """
-        return Color(0, 0, 0)
+        return Color(0.0, 0.0, 0.0)
     
     
 class Lambertian(Material):
@@ -71,13 +88,15 @@ class Lambertian(Material):
         self.texture = texture
     
     def scatter(self, r_in, rec, attenuation, scattered):
-        scatter_dir = rec.normal + Vector3.random_unit_vector()
-        
-        if scatter_dir.near_zero:
-            scatter_dir = rec.normal
+        normal = rec.normal
+        rx, ry, rz = _random_unit_floats()
+        sx, sy, sz = normal.x + rx, normal.y + ry, normal.z + rz
         
         scattered.origin = rec.p
-        scattered.direction = scatter_dir
+        if abs(sx) < 1e-8 and abs(sy) < 1e-8 and abs(sz) < 1e-8:
+            scattered.direction = normal
+        else:
+            scattered.direction = Vector3(sx, sy, sz)
         albedo = self.texture.value(rec.u, rec.v, rec.p)
         attenuation.x, attenuation.y, attenuation.z = albedo.x, albedo.y, albedo.z
         return True
@@ -107,15 +126,23 @@ class Metal(Material):
         self.fuzz = fuzz
     
     def scatter(self, r_in, rec, attenuation, scattered):
-        reflected = reflect(r_in.direction, rec.normal)
-        reflected = reflected.unit_vector + (self.fuzz * Vector3.random_unit_vector())
+        # Reflect across the normal, normalize then offset by the fuzz
+        d, n = r_in.direction, rec.normal
+        nx, ny, nz = n.x, n.y, n.z
+        k = 2.0 * ((d.x * nx) + (d.y * ny) + (d.z * nz))
+        fx, fy, fz = d.x - (nx * k), d.y - (ny * k), d.z - (nz * k)
+        length = sqrt((fx * fx) + (fy * fy) + (fz * fz))
         
-        scattered.origin, scattered.direction = rec.p, reflected
+        fuzz = self.fuzz
+        rx, ry, rz = _random_unit_floats()
+        fx, fy, fz = (fx / length) + (rx * fuzz), (fy / length) + (ry * fuzz), (fz / length) + (rz * fuzz)
+        
+        scattered.origin, scattered.direction = rec.p, Vector3(fx, fy, fz)
         
         albedo = self.texture.value(rec.u, rec.v, rec.p)
         attenuation.x, attenuation.y, attenuation.z = albedo.x, albedo.y, albedo.z
         
-        return (Vector3.dot(scattered.direction, rec.normal) > 0)
+        return ((fx * nx) + (fy * ny) + (fz * nz)) > 0
 
 class Dielectric(Material):
     """A glass-like material"""
@@ -145,18 +172,29 @@ class Dielectric(Material):
         
         
         ri = (1/self.refraction_index) if rec.front_face else self.refraction_index
-        unit_direction = r_in.direction.unit_vector
         
-        cos_theta = min(dot(-unit_direction, rec.normal), 1.0)
+        # The same math as Vector3.reflect() and Vector3.refract() on the
+        # unit direction, worked on floats so no temporary vectors are made
+        d, n = r_in.direction, rec.normal
+        nx, ny, nz = n.x, n.y, n.z
+        length = sqrt((d.x * d.x) + (d.y * d.y) + (d.z * d.z))
+        ux, uy, uz = d.x / length, d.y / length, d.z / length
+        
+        d_dot_n = (ux * nx) + (uy * ny) + (uz * nz)
+        cos_theta = -d_dot_n
+        if cos_theta > 1.0:
+            cos_theta = 1.0
         sin_theta = sqrt(1.0 - cos_theta*cos_theta)
         
-        direction: Vector3
         if (ri * sin_theta) > 1.0:
-            direction = reflect(unit_direction, rec.normal)
+            k = 2.0 * d_dot_n
+            fx, fy, fz = ux - (nx * k), uy - (ny * k), uz - (nz * k)
         else:
-            direction = refract(unit_direction, rec.normal, ri)
+            px, py, pz = (ux + (nx * cos_theta)) * ri, (uy + (ny * cos_theta)) * ri, (uz + (nz * cos_theta)) * ri
+            k = -sqrt(abs(1.0 - ((px * px) + (py * py) + (pz * pz))))
+            fx, fy, fz = px + (nx * k), py + (ny * k), pz + (nz * k)
         
-        scattered.origin, scattered.direction = rec.p, direction
+        scattered.origin, scattered.direction = rec.p, Vector3(fx, fy, fz)
         
         return True
     
@@ -185,8 +223,8 @@ class VectorShade(Material):
         self.reflection_rules = rlike
     
     def scatter(self, r_in, rec, attenuation, scattered):
-        c_at = 0.2 * (rec.normal + Vector3(1, 1, 1))
-        attenuation.x, attenuation.y, attenuation.z = c_at.x, c_at.y, c_at.z
+        normal = rec.normal
+        attenuation.x, attenuation.y, attenuation.z = 0.2 * (normal.x + 1), 0.2 * (normal.y + 1), 0.2 * (normal.z + 1)
         if self.reflection_rules is not None:
             return self.reflection_rules.scatter(r_in=r_in, rec=rec, attenuation=Color.BLACK(), scattered=scattered)
         return False
@@ -211,6 +249,9 @@ class MonoShade(Material):
 class DiffuseLight(Material):
     """Makes an object emit light to the scene around it"""
     
+    emits = True
+    scatters = False
+    
     texture: Texture
     intensity: Color
     
@@ -231,10 +272,11 @@ class DiffuseLight(Material):
             texture = SolidColor(texture)
         self.texture = texture
             
+        intensity = float(intensity)
         self.intensity = Color(intensity, intensity, intensity)
     
     def emitted(self, u: float, v: float, p: Point3):
-        return self.texture.value(u, v, p) * self.intensity
+        return self.texture.value(u, v, p).mul_color(self.intensity)
 
 
 
@@ -37,7 +37,7 @@ class SolidColor(Texture):
     albedo: Color
     
     def __init__(self, albedo: Color) -> None:
-        self.albedo = albedo
+        self.albedo = albedo.as_floats
     
     def value(self, u: float, v: float, p: Point3) -> Color:
         return self.albedo
@@ -0,0 +1,364 @@
+"""
+A Bounding Volume Hierarchy over the assets of a scene,
+flattened into parallel lists so it can be traversed
+without recursion
+"""
+from __future__ import annotations
+import typing as t
+
+from math import sqrt
+
+from .assets.hittable import BVHNode, HitRecord, Interval, Quad, Sphere, Triangle, _INV_ZERO_DIRECTION, _quad_record
+
+if t.TYPE_CHECKING:
+    from .assets.hittable import Hittable
+    from .ray import Ray
+
+
+# Subtrees with this many assets or less are stored as a single leaf,
+# testing a few assets directly is cheaper than more traversal steps
+_LEAF_SIZE = 4
+
+
+class FlatBVH(object):
+    """A Bounding Volume Hierarchy stored as parallel lists of node data"""
+
+    node_min_x: list[float]
+    node_max_x: list[float]
+    node_min_y: list[float]
+    node_max_y: list[float]
+    node_min_z: list[float]
+    node_max_z: list[float]
+
+    # Child indexes of each node, -1 for leaves, and the axis the
+    # children are split along with the lower child on the left
+    node_left: list[int]
+    node_right: list[int]
+    node_axis: list[int]
+
+    # The assets of each leaf, None for inner nodes. Spheres are gathered
+    # into (sphere, center x, center y, center z, radius squared) records,
+    # triangles into (triangle, first vertex x y z, edge 1 x y z, edge 2 x y z)
+    # and quads into (quad, normal x y z, D, corner x y z, alpha axis x y z, beta axis x y z)
+    leaf_spheres: list[list[tuple[Sphere, float, float, float, float]] | None]
+    leaf_triangles: list[list[tuple[Triangle, float, float, float, float, float, float, float, float, float]] | None]
+    leaf_quads: list[list[tuple[Quad, float, float, float, float, float, float, float, float, float, float, float, float, float]] | None]
+    leaf_others: list[list[Hittable] | None]
+
+    # Scratch records reused by every hit call instead of allocating new ones
+    _other_rec: HitRecord
+    _temp_rec: HitRecord
+
+    def __init__(self, assets: list[Hittable]) -> None:
+        """Builds a hierarchy over a list of assets and flattens it in depth first order
+
+        Args:
+            assets (list[Hittable]): The assets to enclose, the list is not modified
+        """
+        self.node_min_x, self.node_max_x = [], []
+        self.node_min_y, self.node_max_y = [], []
+        self.node_min_z, self.node_max_z = [], []
+        self.node_left, self.node_right, self.node_axis = [], [], []
+        self.leaf_spheres, self.leaf_triangles, self.leaf_quads, self.leaf_others = [], [], [], []
+        self._other_rec, self._temp_rec = HitRecord(), HitRecord()
+
+        if assets:
+            # BVHNode sorts the list it is given, so pass a copy
+            self._flatten(BVHNode(list(assets)))
+
+    def _flatten(self, root: Hittable) -> None:
+        """Appends a node and all of its children to the lists, parents
+        before children and left subtrees before right ones
+
+        Args:
+            root (Hittable): A BVHNode or a single asset
+        """
+        # Walked with a stack of (node, parent index, is the right child)
+        # so deep hierarchies can't run past the recursion limit
+        pending = [(root, -1, False)]
+        while pending:
+            node, parent, is_right = pending.pop()
+            index = len(self.node_left)
+            if parent >= 0:
+                (self.node_right if is_right else self.node_left)[parent] = index
+
+            bbox = node.bbox
+            # Bounds built from int coordinates are converted so the slab test
+            # only ever does float math
+            self.node_min_x.append(float(bbox.x.min))
+            self.node_max_x.append(float(bbox.x.max))
+            self.node_min_y.append(float(bbox.y.min))
+            self.node_max_y.append(float(bbox.y.max))
+            self.node_min_z.append(float(bbox.z.min))
+            self.node_max_z.append(float(bbox.z.max))
+            self.node_left.append(-1)
+            self.node_right.append(-1)
+            self.node_axis.append(getattr(node, "axis", 0))
+            self.leaf_spheres.append(None)
+            self.leaf_triangles.append(None)
+            self.leaf_quads.append(None)
+            self.leaf_others.append(None)
+
+            assets = _subtree_assets(node, _LEAF_SIZE)
+            if assets is not None:
+                self._set_leaf(index, assets)
+            else:
+                pending.append((node.right, index, True))
+                pending.append((node.left, index, False))
+
+    def _set_leaf(self, index: int, assets: list[Hittable]) -> None:
+        spheres = [asset for asset in assets if isinstance(asset, Sphere)]
+        triangles = [asset for asset in assets if isinstance(asset, Triangle)]
+        quads = [asset for asset in assets if isinstance(asset, Quad)]
+        others = [asset for asset in assets if not isinstance(asset, (Sphere, Triangle, Quad))]
+
+        # Everything the intersections need is read once here, a leaf
+        # then tests all of its spheres, triangles and quads over plain floats
+        if spheres:
+            self.leaf_spheres[index] = [
+                (sphere, sphere.center.x, sphere.center.y, sphere.center.z, sphere.radius_sq)
+                for sphere in spheres
+            ]
+        if triangles:
+            self.leaf_triangles[index] = [
+                (
+                    triangle,
+                    float(triangle.vertices[0].x), float(triangle.vertices[0].y), float(triangle.vertices[0].z),
+                    triangle.edge_1.x, triangle.edge_1.y, triangle.edge_1.z,
+                    triangle.edge_2.x, triangle.edge_2.y, triangle.edge_2.z,
+                )
+                for triangle in triangles
+            ]
+        if quads:
+            self.leaf_quads[index] = [_quad_record(quad) for quad in quads]
+        if others:
+            self.leaf_others[index] = others
+
+    def hit(self, r: Ray, ray_t: Interval, rec: HitRecord) -> bool:
+        """Returns True if Ray r hits any asset in the hierarchy and saves the closest hit
+        to HitRecord rec
+
+        Args:
+            r (Ray): Ray to check
+            ray_t (Interval): Interval to check, the max is set to the closest hit
+            rec (HitRecord): The record to save the closest hit to
+
+        Returns:
+            bool: If any asset was hit
+        """
+        node_left = self.node_left
+        if not node_left:
+            return False
+
+        # Get everything used per node as a local
+        node_right, node_axis = self.node_right, self.node_axis
+        min_x, max_x = self.node_min_x, self.node_max_x
+        min_y, max_y = self.node_min_y, self.node_max_y
+        min_z, max_z = self.node_min_z, self.node_max_z
+        leaf_spheres, leaf_triangles, leaf_others = self.leaf_spheres, self.leaf_triangles, self.leaf_others
+        leaf_quads = self.leaf_quads
+
+        ox, oy, oz = r.origin.x, r.origin.y, r.origin.z
+        dx, dy, dz = r.direction.x, r.direction.y, r.direction.z
+        a = (dx * dx) + (dy * dy) + (dz * dz)
+        inv_dx = (1.0 / dx) if dx else _INV_ZERO_DIRECTION
+        inv_dy = (1.0 / dy) if dy else _INV_ZERO_DIRECTION
+        inv_dz = (1.0 / dz) if dz else _INV_ZERO_DIRECTION
+        
+        # Per axis, if the ray travels towards lower coordinates
+        dir_negative = (dx < 0, dy < 0, dz < 0)
+
+        t_min, closest = ray_t.min, ray_t.max
+        ahead = t_min >= 0.0
+
+        # Spheres, triangles and quads are only written to the record once traversal is done,
+        # other assets write to a temporary record that is swapped in on a hit
+        closest_sphere = None
+        closest_triangle, triangle_u, triangle_v = None, 0.0, 0.0
+        closest_quad, quad_u, quad_v = None, 0.0, 0.0
+        hit_other = False
+        other_rec, temp_rec = self._other_rec, self._temp_rec
+        other_t = Interval(t_min, closest)
+
+        stack = [0]
+        pop, push = stack.pop, stack.append
+        while stack:
+            i = pop()
+
+            # Slab test of the node bounds clipped to the closest hit so far
+            t0, t1 = (min_x[i] - ox) * inv_dx, (max_x[i] - ox) * inv_dx
+            if t0 > t1:
+                t0, t1 = t1, t0
+            t_enter = t0 if t0 > t_min else t_min
+            t_exit = t1 if t1 < closest else closest
+            if t_exit < t_enter:
+                continue
+
+            t0, t1 = (min_y[i] - oy) * inv_dy, (max_y[i] - oy) * inv_dy
+            if t0 > t1:
+                t0, t1 = t1, t0
+            if t0 > t_enter:
+                t_enter = t0
+            if t1 < t_exit:
+                t_exit = t1
+            if t_exit < t_enter:
+                continue
+
+            t0, t1 = (min_z[i] - oz) * inv_dz, (max_z[i] - oz) * inv_dz
+            if t0 > t1:
+                t0, t1 = t1, t0
+            if t0 > t_enter:
+                t_enter = t0
+            if t1 < t_exit:
+                t_exit = t1
+            if t_exit < t_enter:
+                continue
+
+            # Visit the child nearer the ray first, the hits found there
+            # shrink the closest distance and let the far child be skipped
+            left = node_left[i]
+            if left >= 0:
+                if dir_negative[node_axis[i]]:
+                    push(left)
+                    push(node_right[i])
+                else:
+                    push(node_right[i])
+                    push(left)
+                continue
+
+            spheres = leaf_spheres[i]
+            if spheres is not None:
+                for sphere, cx, cy, cz, radius_sq in spheres:
+                    ocx, ocy, ocz = cx - ox, cy - oy, cz - oz
+                    h = (dx * ocx) + (dy * ocy) + (dz * ocz)
+                    c = (ocx * ocx) + (ocy * ocy) + (ocz * ocz) - radius_sq
+
+                    # Starting outside a sphere behind the ray, both roots are negative
+                    if h < 0.0 and c > 0.0 and ahead:
+                        continue
+
+                    discriminant = (h * h) - (a * c)
+                    if discriminant < 0:
+                        continue
+
+                    sqrtd = sqrt(discriminant)
+                    root = (h - sqrtd) / a
+                    if not (t_min < root < closest):
+                        root = (h + sqrtd) / a
+                        if not (t_min < root < closest):
+                            continue
+
+                    closest = root
+                    closest_sphere = sphere
+                    closest_triangle = None
+                    closest_quad = None
+
+            triangles = leaf_triangles[i]
+            if triangles is not None:
+                # Moller-Trumbore, the same test as Triangle.hit
+                for triangle, v0x, v0y, v0z, e1x, e1y, e1z, e2x, e2y, e2z in triangles:
+                    px, py, pz = (dy * e2z) - (dz * e2y), (dz * e2x) - (dx * e2z), (dx * e2y) - (dy * e2x)
+                    det = (px * e1x) + (py * e1y) + (pz * e1z)
+                    if -1e-8 < det < 1e-8:
+                        continue
+
+                    inv_det = 1.0 / det
+                    tx, ty, tz = ox - v0x, oy - v0y, oz - v0z
+                    u = ((px * tx) + (py * ty) + (pz * tz)) * inv_det
+                    if not (0.0 <= u <= 1.0):
+                        continue
+
+                    qx, qy, qz = (ty * e1z) - (tz * e1y), (tz * e1x) - (tx * e1z), (tx * e1y) - (ty * e1x)
+                    v = ((qx * dx) + (qy * dy) + (qz * dz)) * inv_det
+                    if v < 0.0 or u + v > 1.0:
+                        continue
+
+                    root = ((e2x * qx) + (e2y * qy) + (e2z * qz)) * inv_det
+                    if not (t_min <= root <= closest):
+                        continue
+
+                    closest = root
+                    closest_triangle, triangle_u, triangle_v = triangle, u, v
+                    closest_sphere = None
+                    closest_quad = None
+
+            quads = leaf_quads[i]
+            if quads is not None:
+                # The same test as Quad.hit
+                for quad, nx, ny, nz, D, cx, cy, cz, ax, ay, az, bx, by, bz in quads:
+                    denom = (nx * dx) + (ny * dy) + (nz * dz)
+                    if -1e-8 < denom < 1e-8:
+                        continue
+
+                    root = (D - ((nx * ox) + (ny * oy) + (nz * oz))) / denom
+                    if not (t_min <= root <= closest):
+                        continue
+
+                    hx, hy, hz = (ox + (root * dx)) - cx, (oy + (root * dy)) - cy, (oz + (root * dz)) - cz
+                    alpha = (hx * ax) + (hy * ay) + (hz * az)
+                    if not (0.0 <= alpha <= 1.0):
+                        continue
+                    beta = (hx * bx) + (hy * by) + (hz * bz)
+                    if not (0.0 <= beta <= 1.0):
+                        continue
+
+                    closest = root
+                    closest_quad, quad_u, quad_v = quad, alpha, beta
+                    closest_sphere = None
+                    closest_triangle = None
+
+            others = leaf_others[i]
+            if others is not None:
+                for asset in others:
+                    other_t.max = closest
+                    if asset.hit(r, other_t, temp_rec):
+                        closest = temp_rec.t
+                        closest_sphere = None
+                        closest_triangle = None
+                        closest_quad = None
+                        hit_other = True
+                        other_rec, temp_rec = temp_rec, other_rec
+
+        if closest_sphere is not None:
+            closest_sphere.record_hit(r, closest, rec)
+        elif closest_triangle is not None:
+            closest_triangle.record_hit(r, closest, triangle_u, triangle_v, rec)
+        elif closest_quad is not None:
+            closest_quad.record_hit(r, closest, quad_u, quad_v, rec)
+        elif hit_other:
+            rec.copy_data(other_rec)
+        else:
+            return False
+
+        ray_t.max = closest
+        return True
+
+
+def _subtree_assets(node: Hittable, limit: int) -> list[Hittable] | None:
+    """Collects every asset contained within a BVHNode, or the asset itself,
+    stopping early once there are more than limit of them
+
+    Args:
+        node (Hittable): A BVHNode or a single asset
+        limit (int): The most assets to collect
+
+    Returns:
+        list[Hittable] | None: The assets in the subtree, None if there are more than limit
+    """
+    # Only small subtrees are ever collected, so each node is walked a bounded
+    # number of steps instead of once for every node above it
+    assets = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, BVHNode):
+            if len(assets) == limit:
+                return None
+            assets.append(node)
+        elif node.left is node.right:
+            # Nodes of a single asset store it as both children
+            stack.append(node.left)
+        else:
+            stack.append(node.right)
+            stack.append(node.left)
+    return assets
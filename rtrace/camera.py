@@ -2,14 +2,14 @@ from __future__ import annotations
 import typing as t
 import os
 
-from math import ceil, pi, tan
-from random import random
+from math import ceil, pi, sqrt, tan
+from random import random, getrandbits, getstate, setstate, seed as seed_rng
 
 import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
 from PIL import Image
 from tqdm import tqdm
 
-from .color import Color
 from .vec3 import Vector3
 from .ray import Ray
 
@@ -22,14 +22,37 @@ if t.TYPE_CHECKING:
 _HEIGHT_ASPECT_BOUNDARY = 4
 
 # After testing, its faster to use smaller numbers
-# 16 yielded the best results
-_MULTIPROCESS_BLOCK_SIZE = 64
+# 16 yielded the best results. Both render paths walk
+# the image in square tiles of this size, grown for
+# high sample counts where each tile takes long enough
+# that fewer, larger tiles cut the round trips to workers
+_MULTIPROCESS_BLOCK_SIZE = 16
+
+# Tiles are handed to workers in batches, aiming for this many
+# batches per worker so they stay evenly loaded to the end
+_BATCHES_PER_WORKER = 4
 
 _PI_OVER_SEMICIRCLE = pi / 180.0
 
+# Set in each pool worker by _init_render_worker, the camera, scene and
+# image buffer are sent once per worker instead of along with every tile
+_worker_camera: Camera | None = None
+_worker_scene: Scene | None = None
+_worker_shm: SharedMemory | None = None
+
 def degrees_to_radians(deg: float) -> float:
     return deg * _PI_OVER_SEMICIRCLE
 
+def save_image(im: Image.Image, fp: os.PathLike | t.BinaryIO) -> None:
+    """Saves a rendered image to a path, or as a PNG to a binary file object
+
+    Args:
+        im (Image.Image): The image to save
+        fp (os.PathLike | t.BinaryIO): The path to save to, or a file object such as io.BytesIO
+    """
+    # File objects have no extension to take the format from
+    im.save(fp, None if isinstance(fp, (str, os.PathLike)) else "PNG")
+
 class Camera:
     """Represents a camera within a scene, given location and scale"""
     
@@ -52,10 +75,14 @@ class Camera:
     defocus_disc_v: Vector3
     
     center: Point3
+    lookat: Point3
+    upvec: Vector3
+    focus_dist: float
     
     offset_server: t.Callable
     
     use_multiprocess: bool
+    seed: int
     
     fov: float
     
@@ -75,7 +102,8 @@ class Camera:
             focus_angle: float = 0,
             focus_dist: float = 10,
             offset_server: t.Literal["s", "d"] = "s",
-            use_multiprocess: bool = True
+            use_multiprocess: bool = True,
+            seed: int | None = None
         ) -> None:
         """Creates a camera for a virtual scene
 
@@ -104,6 +132,11 @@ class Camera:
             offset_server (Literal['s', 'd'], optional): 
                 Changes what function is used to generate offsets for each ray sample. 
                 Disregarded if the :samples: param is set to 1. Defaults to "s".
+            
+            seed (int | None, optional): 
+                The seed that random sampling for every pixel is derived from, rendering 
+                the same scene with the same seed gives the same image. Defaults to a 
+                random seed chosen when the camera is created.
         """
         self._img_width = width
         
@@ -118,21 +151,44 @@ class Camera:
         
         # self.focal_length = (center - lookat).length
         self.center = center
+        self.lookat = lookat
+        self.upvec = upvec
+        self.focus_dist = focus_dist
         
         self.samples = max(samples, 1)
         self.sample_scale = 1 / samples
         self.recursion_limit = recursion_limit
         
         self.fov = fov
+        self.defocus_angle = focus_angle
+        self.invalidate()
+        
+        self.offset_server = {
+            "s" : self.sample_square,
+            "d" : self.derterministic_square
+        }[offset_server] if self.samples > 1 else self.monosampled_square
+        
+        self.use_multiprocess = use_multiprocess
+        self.seed = seed if seed is not None else getrandbits(32)
+        
+    
+    def invalidate(self) -> None:
+        """Recomputes the viewport and ray basis of the camera, rays are cast from
+        these cached vectors so this must be called after changing the center, 
+        lookat, upvec, fov, focus_dist or defocus_angle of the camera. 
+        Changing the image size calls this automatically
+        """
+        self.center = self.center.as_floats
+        
         # This calculation generates the viewport height constant
-        theta = degrees_to_radians(fov)
+        theta = degrees_to_radians(self.fov)
         h = tan(theta / 2)
             
-        self.viewport_height = 2 * h * focus_dist
+        self.viewport_height = 2 * h * self.focus_dist
         self.viewport_width = self.viewport_height * (self.img_width / self.img_height)
         
-        self.w = (center - lookat).unit_vector
-        self.u = Vector3.cross(upvec, self.w).unit_vector
+        self.w = (self.center - self.lookat).unit_vector
+        self.u = Vector3.cross(self.upvec, self.w).unit_vector
         self.v = Vector3.cross(self.w, self.u)
         
         self.viewport_u = self.viewport_width * self.u
@@ -141,23 +197,14 @@ class Camera:
         self.pixel_delta_u = self.viewport_u / self.img_width
         self.pixel_delta_v = self.viewport_v / self.img_height
         
-        self.viewport_upper_left = self.center - (focus_dist * self.w) - self.viewport_u/2 - self.viewport_v/2
+        self.viewport_upper_left = self.center - (self.focus_dist * self.w) - self.viewport_u/2 - self.viewport_v/2
         self.pixel00_loc = self.viewport_upper_left + 0.5 * (self.pixel_delta_u + self.pixel_delta_v)
         
-        self.defocus_angle = focus_angle
-        defocus_radians = focus_dist * tan(degrees_to_radians((self.defocus_angle / 2)))
+        defocus_radians = self.focus_dist * tan(degrees_to_radians((self.defocus_angle / 2)))
         self.defocus_disc_u = self.u * defocus_radians 
         self.defocus_disc_v = self.v * defocus_radians
         
-        self.offset_server = {
-            "s" : self.sample_square,
-            "d" : self.derterministic_square
-        }[offset_server] if self.samples > 1 else self.monosampled_square
-        
         self.center_server = self.get_center if self.defocus_angle <= 0 else self.defocus_disc_sample
-        
-        self.use_multiprocess = use_multiprocess
-        
     
     @classmethod
     def pre_render(cls, aspect_ratio: float, center: Point3) -> Camera:
@@ -184,6 +231,7 @@ class Camera:
         # init while preserving all other settings. 
         # Mainly for use with external applications like a GUI
         self._img_width = value
+        self.invalidate()
     
     @property
     def img_height(self) -> int:
@@ -193,6 +241,7 @@ class Camera:
     @img_height.setter
     def img_height(self, value: int | float) -> None:
         self._img_height = value
+        self.invalidate()
     
     @property
     def aspect_ratio(self) -> float:
@@ -203,143 +252,296 @@ class Camera:
     def aspect_ratio(self, value: float) -> None:
         self._aspect_ratio = value
     
-    def render(self, scene: Scene, fp: os.PathLike, filter: t.Callable[[Image.Image],Image.Image] | None = None, silent: bool = False) -> None:
+    @property
+    def block_size(self) -> int:
+        """The side length of the square tiles the image is rendered in,
+        larger when there are more samples per pixel"""
+        if self.samples <= 32:
+            return _MULTIPROCESS_BLOCK_SIZE
+        return _MULTIPROCESS_BLOCK_SIZE * (2 if self.samples <= 128 else 4)
+    
+    @property
+    def tile_count(self) -> int:
+        """The number of tiles the image is rendered in"""
+        size = self.block_size
+        return ceil(self.img_height / size) * ceil(self.img_width / size)
+    
+    def tiles(self) -> t.Iterator[tuple[tuple[int, int], tuple[int, int]]]:
+        """Yields the x and y bounds of every square tile of the image, left
+        to right then top to bottom. Tiles along the right and bottom edges are
+        cut short to fit the image
+
+        Returns:
+            Iterator[tuple[tuple[int, int], tuple[int, int]]]: The (x0, x1), (y0, y1) bounds of each tile
+        """
+        size = self.block_size
+        for y0 in range(0, self.img_height, size):
+            for x0 in range(0, self.img_width, size):
+                yield (x0, min(x0 + size, self.img_width)), (y0, min(y0 + size, self.img_height))
+    
+    def render(self, scene: Scene, fp: os.PathLike | t.BinaryIO, filter: t.Callable[[Image.Image],Image.Image] | None = None, silent: bool = False) -> None:
         """Renders an image by propogating rays though a selec scene and saves to a file
         
         >>> Camera.render(scene, "im.png", silent = False)
         
         Args:
             scene (Scene): The scene to render
-            fp (os.PathLike): The path to save to, including file name.
+            fp (os.PathLike | t.BinaryIO): The path to save to, including file name. A binary file object such as io.BytesIO is written to as a PNG.
             filter (t.Callable[[Image.Image],Image.Image] | None, optional): A function to call that applies a filter to the final image be fore saving. Defaults to None.
             silent (bool, optional): Whether to print updates to the console. Defaults to False.
         """
+        # Pack the scene once here so worker processes
+        # receive the compiled layout instead of rebuilding it
+        scene.compile()
+        
         if self.use_multiprocess:
             self.render_multi(scene=scene, fp=fp, filter=filter, silent = silent)
         else:
             self.render_mono(scene=scene, fp=fp, filter=filter, silent = silent)
     
-    def render_multi(self, scene: Scene, fp: os.PathLike, filter: t.Callable[[Image.Image],Image.Image] | None = None, silent: bool = False, show: bool = False) -> None:
+    def render_multi(self, scene: Scene, fp: os.PathLike | t.BinaryIO, filter: t.Callable[[Image.Image],Image.Image] | None = None, silent: bool = False, show: bool = False) -> None:
         """Renders a scene by segmenting into blocks and executing each as a subprocess
         To respect camera settings, call the standard render method
         >>> Camera.render(scene, "im.png", silent = False)
         
         Args:
             scene (Scene): The scene to render
-            fp (os.PathLike): The path to save to
+            fp (os.PathLike | t.BinaryIO): The path or binary file object to save to
         """
         # Multiprocessing results in a 688.57% speed increase from standard.
-        im = Image.new("RGB", (self.img_width, self.img_height), (0, 0, 0))
-        
-        # Generate a list of block bounds
-        def block_args():
-            for blc_y in range(ceil(self.img_height / _MULTIPROCESS_BLOCK_SIZE)):
-                for blc_x in range(ceil(self.img_width / _MULTIPROCESS_BLOCK_SIZE)):
-                    yield (
-                        scene, 
-                        (blc_x * _MULTIPROCESS_BLOCK_SIZE, min((blc_x + 1) * _MULTIPROCESS_BLOCK_SIZE, self.img_width)), 
-                        (blc_y * _MULTIPROCESS_BLOCK_SIZE, min((blc_y + 1) * _MULTIPROCESS_BLOCK_SIZE, self.img_height)),
-                        silent
-                    )
-
-        # Dispaatch each block to a process and paste the resulting image to the main canvas
-        with mp.Pool() as pool:
-            
-            progress = tqdm(
-                total = ceil(self.img_height / _MULTIPROCESS_BLOCK_SIZE) * ceil(self.img_width / _MULTIPROCESS_BLOCK_SIZE), 
-                desc="waiting for worker threads"
-            ) if not silent else None
-            
-            for pos, img_block in pool.starmap(self._render_block, block_args()):
-                im.paste(img_block, pos)
+        # Workers write their pixels straight into a shared RGB buffer and
+        # only send back where the block was, so no image data is pickled
+        shm = SharedMemory(create=True, size=self.img_width * self.img_height * 3)
+        
+        # Batching tiles cuts the round trips to the workers when tiles render quickly
+        workers = os.cpu_count() or 1
+        chunksize = max(1, self.tile_count // (workers * _BATCHES_PER_WORKER))
+        
+        # Dispaatch each block to a process, every block is in the shared buffer once they return.
+        # Tasks only carry the block bounds, the workers are given the scene when they start
+        try:
+            with mp.Pool(workers, initializer=_init_render_worker, initargs=(self, scene, shm.name)) as pool:
+                
+                progress = tqdm(
+                    total = self.tile_count, 
+                    desc="waiting for worker threads"
+                ) if not silent else None
+                
+                for _ in pool.imap_unordered(_render_worker_tile, self.tiles(), chunksize):
+                    if not silent:
+                        progress.update()
                 
                 if not silent:
-                    progress.update()
+                    progress.close()
             
-            if not silent:
-                progress.close()
+            im = Image.frombytes("RGB", (self.img_width, self.img_height), shm.buf.tobytes())
+        finally:
+            shm.close()
+            shm.unlink()
         
         # Image filter step, user defined
         if filter is not None:
             im = filter(im)
         # Save the image
-        im.save(fp)
+        save_image(im, fp)
     
     
-    # Convert to a single function definition to save 
-    def _render_block(self, scene: Scene, range_x: tuple[int, int], range_y: tuple[int, int], silent: bool = False) -> None:
-        """Renders a set block of the image, used for worker threads when multiprocessing
+    def _render_block(self, scene: Scene, range_x: tuple[int, int], range_y: tuple[int, int], buf: bytearray | memoryview) -> tuple[int, int]:
+        """Renders a set block of the image and writes it into an RGB buffer the size
+        of the full image, a bytearray on a single process or the shared memory block
+        when multiprocessing
 
         Args:
-            im (Image.Image): The PIL.Image to write data to
             scene (Scene): The scene to propogate rays through
             range_x (tuple[int, int]): The x parameters of the block where range_x[0] < range_x[1]
             range_y (tuple[int, int]): The y corners of the block, where range_y[0] < range_y[1]
+            buf (bytearray | memoryview): The buffer holding the image
+
+        Returns:
+            tuple[int, int]: The upper left corner of the block
         """
+        block = self._render_pixels(scene, range_x, range_y)
+        
+        x0, x1 = range_x
+        block_stride = (x1 - x0) * 3
+        
+        # Copy the block in one row at a time, rows of the
+        # block are not contiguous within the full image
+        for row, y in enumerate(range(*range_y)):
+            start = ((y * self.img_width) + x0) * 3
+            buf[start:start + block_stride] = block[row * block_stride:(row + 1) * block_stride]
+        
+        return (x0, range_y[0])
     
-        block_width, block_height = range_x[1] - range_x[0], range_y[1] - range_y[0]
+    # The single pixel kernel shared by every render path, all
+    # per-pixel work for the image happens within this method
+    def _render_pixels(self, scene: Scene, range_x: tuple[int, int], range_y: tuple[int, int]) -> bytearray:
+        """Renders a set block of the image to 8 bit RGB pixel data
+
+        Args:
+            scene (Scene): The scene to propogate rays through
+            range_x (tuple[int, int]): The x parameters of the block where range_x[0] < range_x[1]
+            range_y (tuple[int, int]): The y corners of the block, where range_y[0] < range_y[1]
+
+        Returns:
+            bytearray: The pixels of the block row by row, three bytes per pixel
+        """
+        # Random state is keyed on the block rather than carried over from the
+        # worker, forked workers would otherwise all start from the same state.
+        # Both render paths walk the same tiles from Camera.tiles(), so the image
+        # doesn't change with how many processes rendered it. Seeding once per block
+        # rather than per pixel, reseeding every pixel slowed previews by almost half
+        row_width = self.img_width
+        seed_rng((self.seed * row_width * self.img_height) + (range_y[0] * row_width) + range_x[0])
+        
+        if self.samples == 1 and self.defocus_angle <= 0:
+            return self._render_pixels_single(scene, range_x, range_y)
+        
+        x0, x1 = range_x
+        y0, y1 = range_y
         
-        im = Image.new("RGB", (block_width, block_height), (0, 0, 0))
+        pixels = bytearray(3 * (x1 - x0) * (y1 - y0))
+        i = 0
         
-        gr = self.get_ray
+        # Every lookup that would otherwise happen once per
+        # sample is hoisted out of the loop into a local
+        offset_server = self.offset_server
+        center_server = self.center_server
+        
+        # The default random offsets are drawn here as floats, the same
+        # two numbers Camera.sample_square() would wrap in a vector.
+        # Without defocus blur every ray starts at the camera center
+        random_offsets = offset_server == self.sample_square
+        defocus = center_server != self.get_center
+        ray_color = scene.ray_color
         rlim = self.recursion_limit
         sample_scale = self.sample_scale
+        sample_range = range(self.samples)
         
-        for i in range(block_width * block_height):
-            x, y = i % block_width, i // block_width
-            # For loop completion, move to seperate function
-            pixel_color = Color(0, 0, 0)
-            
-            for iter in range(self.samples):
-                # Optional index for deterministic offset servers
-                r = gr(x + range_x[0], y + range_y[0], iter)
-                pixel_color += scene.ray_color(r, rlim)
+        # Rays are generated the same as Camera.get_ray(), but on floats
+        # rather than through a chain of temporary vectors. The direction
+        # through the corner of each pixel is the same for all of its
+        # samples, so only the offset is added per sample
+        center, p00 = self.center, self.pixel00_loc
+        du, dv = self.pixel_delta_u, self.pixel_delta_v
+        dux, duy, duz = du.x, du.y, du.z
+        dvx, dvy, dvz = dv.x, dv.y, dv.z
+        start_x, start_y, start_z = p00.x - center.x, p00.y - center.y, p00.z - center.z
+        
+        # Offsets of each column of the block from the first column of the image
+        columns = [(x, x * dux, x * duy, x * duz) for x in range(x0, x1)]
+        
+        for y in range(y0, y1):
+            row_x = start_x + (y * dvx)
+            row_y = start_y + (y * dvy)
+            row_z = start_z + (y * dvz)
             
-            im.putpixel((x, y), (pixel_color * sample_scale).as_tuple(256))
+            for x, col_x, col_y, col_z in columns:
+                red, green, blue = 0.0, 0.0, 0.0
+                base_x, base_y, base_z = row_x + col_x, row_y + col_y, row_z + col_z
+                
+                for iter in sample_range:
+                    if random_offsets:
+                        ox, oy = random() - 0.5, random() - 0.5
+                    else:
+                        # Optional index for deterministic offset servers
+                        offset = offset_server(iter)
+                        ox, oy = offset.x, offset.y
+                    color = ray_color(Ray(center_server() if defocus else center, Vector3(
+                        base_x + (ox * dux) + (oy * dvx),
+                        base_y + (ox * duy) + (oy * dvy),
+                        base_z + (ox * duz) + (oy * dvz),
+                    )), rlim)
+                    red += color.x
+                    green += color.y
+                    blue += color.z
+                
+                # Gamma correct and clamp straight to bytes, the same
+                # result as Color.as_tuple(256) without the objects
+                red = int(256.0 * sqrt(red * sample_scale))
+                green = int(256.0 * sqrt(green * sample_scale))
+                blue = int(256.0 * sqrt(blue * sample_scale))
+                pixels[i] = red if red < 256 else 255
+                pixels[i + 1] = green if green < 256 else 255
+                pixels[i + 2] = blue if blue < 256 else 255
+                i += 3
         
-        # if not silent:
-        #     print(f"Block ({range_x[0]}, {range_y[0]}) finished")
-         
-        return (range_x[0], range_y[0]), im
+        return pixels
     
-    def render_mono(self, scene: Scene, fp: os.PathLike, filter: t.Callable[[Image.Image],Image.Image] | None = None, silent: bool = False) -> None:
-        """Exact same as Camera.render() except renders the entire image
-        on a single process rather than the entire CPU
+    def _render_pixels_single(self, scene: Scene, range_x: tuple[int, int], range_y: tuple[int, int]) -> bytearray:
+        """A version of Camera._render_pixels() specialized for one sample per pixel
+        without defocus blur, such as previews. Every pixel has exactly one ray
+        through its center so the sample loop and offset servers are skipped
 
         Args:
-            im (Image.Image): The image to write data to
             scene (Scene): The scene to propogate rays through
+            range_x (tuple[int, int]): The x parameters of the block where range_x[0] < range_x[1]
+            range_y (tuple[int, int]): The y corners of the block, where range_y[0] < range_y[1]
+
+        Returns:
+            bytearray: The pixels of the block row by row, three bytes per pixel
         """
-        im = Image.new("RGB", (self.img_width, self.img_height), (0, 0, 0))
+        x0, x1 = range_x
+        y0, y1 = range_y
+        
+        pixels = bytearray(3 * (x1 - x0) * (y1 - y0))
+        i = 0
         
-        # Get functions to avoid using .__getattr__ in loop
-        # Attrs are hashed, meaning the loop would have to
-        # hash this each time
-        gr = self.get_ray
+        ray_color = scene.ray_color
         rlim = self.recursion_limit
-        sample_scale = self.sample_scale
-        width, height = self.img_width, self.img_width
-        # Not consistently faster to assign local for non-self methods
         
-        # Reducing the number of assignments makes the program consistently 
-        # run 5 iterations / sec faster per improvement
+        # Ray directions are built from floats rather than vector math
+        center = self.center
+        du, dv = self.pixel_delta_u, self.pixel_delta_v
+        start = self.pixel00_loc - center
         
-        for i in (tqdm(range(self.img_width * self.img_height)) if not silent else range(self.img_width * self.img_height)):
-            x, y = i % width, i // height
-            # For loop completion
-            pixel_color = Color(0, 0, 0)
+        for y in range(y0, y1):
+            row_x = start.x + (y * dv.x)
+            row_y = start.y + (y * dv.y)
+            row_z = start.z + (y * dv.z)
             
-            for iter in range(self.samples):
-                # Optional index for deterministic offset servers
-                r = gr(x, y, iter)
-                pixel_color += scene.ray_color(r, rlim)
-            
-            im.putpixel((x, y), (pixel_color * sample_scale).as_tuple(256))
+            for x in range(x0, x1):
+                color = ray_color(Ray(center, Vector3(row_x + (x * du.x), row_y + (x * du.y), row_z + (x * du.z))), rlim)
+                
+                red = int(256.0 * sqrt(color.x))
+                green = int(256.0 * sqrt(color.y))
+                blue = int(256.0 * sqrt(color.z))
+                pixels[i] = red if red < 256 else 255
+                pixels[i + 1] = green if green < 256 else 255
+                pixels[i + 2] = blue if blue < 256 else 255
+                i += 3
+        
+        return pixels
+    
+    def render_mono(self, scene: Scene, fp: os.PathLike | t.BinaryIO, filter: t.Callable[[Image.Image],Image.Image] | None = None, silent: bool = False) -> None:
+        """Exact same as Camera.render() except renders the entire image
+        on a single process rather than the entire CPU
+
+        Args:
+            scene (Scene): The scene to propogate rays through
+            fp (os.PathLike | t.BinaryIO): The path or binary file object to save to
+        """
+        canvas = bytearray(self.img_width * self.img_height * 3)
+        
+        # Render one tile at a time through the block kernel, neighbouring
+        # rays take similar paths through the scene and its hierarchy.
+        # Tiles are written into the canvas, which becomes the image at the end
+        # Every tile reseeds the random module, the caller's random state is
+        # put back afterwards so scripts drawing from it carry on unaffected
+        rng_state = getstate()
+        try:
+            tiles = self.tiles()
+            for range_x, range_y in (tqdm(tiles, total=self.tile_count) if not silent else tiles):
+                self._render_block(scene, range_x, range_y, canvas)
+        finally:
+            setstate(rng_state)
+        
+        im = Image.frombytes("RGB", (self.img_width, self.img_height), bytes(canvas))
         
         if filter is not None:
             im = filter(im)
         
-        im.save(fp)
+        save_image(im, fp)
     
     def get_ray(self, i: int, j: int, iter: int) -> Ray:
         """Returns a Ray object with some offset directed through 
@@ -393,4 +595,29 @@ class Camera:
     
     def monosampled_square(self, iter: int) -> Vector3:
         return Vector3(0, 0, 0)
-    
\ No newline at end of file
+    
+
+
+def _init_render_worker(camera: Camera, scene: Scene, shm_name: str) -> None:
+    """Stores the camera and scene in a pool worker and attaches the shared image buffer
+
+    Args:
+        camera (Camera): The camera rendering the image
+        scene (Scene): The scene to render
+        shm_name (str): The name of the shared memory block holding the image
+    """
+    global _worker_camera, _worker_scene, _worker_shm
+    _worker_camera, _worker_scene = camera, scene
+    _worker_shm = SharedMemory(name=shm_name)
+
+def _render_worker_tile(tile: tuple[tuple[int, int], tuple[int, int]]) -> tuple[int, int]:
+    """Renders one tile of the image inside a pool worker
+
+    Args:
+        tile (tuple[tuple[int, int], tuple[int, int]]): The x and y ranges of the tile
+
+    Returns:
+        tuple[int, int]: The upper left corner of the tile
+    """
+    range_x, range_y = tile
+    return _worker_camera._render_block(_worker_scene, range_x, range_y, _worker_shm.buf)
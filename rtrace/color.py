@@ -81,6 +81,16 @@ class Color(object):
     def __rmod__(self, other: Color | float | int) -> Color:
         return self.__mod__(other)
     
+    def mul_scalar(self, s: float | int) -> Color:
+        """Multiplies every channel by a number, the same as self * s
+        without the type check and operator dispatch"""
+        return Color(self.x * s, self.y * s, self.z * s)
+    
+    def mul_color(self, other: Color) -> Color:
+        """Multiplies each channel by the matching channel of another
+        color, the same as self * other without the type check"""
+        return Color(self.x * other.x, self.y * other.y, self.z * other.z)
+    
     def as_tuple(self, shift: int | float = 255, intensity: Interval = Interval(0, 1)) -> tuple[float, float, float]:
         return (
             int(shift * intensity.clamp(self.r_sqrt)), 
@@ -112,6 +122,11 @@ class Color(object):
     def b_sqrt(self) -> float:
         return sqrt(self.b)
     
+    @property
+    def as_floats(self) -> Color:
+        """A copy of this color with every channel as a float"""
+        return Color(float(self.x), float(self.y), float(self.z))
+    
     # --< Class Methods >-- #
     @classmethod
     def average(cls, c1: Color, c2: Color) -> Color:
@@ -120,7 +135,7 @@ class Color(object):
     # --< Default / Common Colors >-- #
     @classmethod
     def WHITE(cls) -> Color:
-        return cls(1, 1, 1)
+        return cls(1.0, 1.0, 1.0)
     
     @classmethod
     def GRAY(cls) -> Color:
@@ -128,17 +143,17 @@ class Color(object):
     
     @classmethod
     def BLACK(cls) -> Color:
-        return cls(0, 0, 0)
+        return cls(0.0, 0.0, 0.0)
     
     @classmethod
     def RED(cls) -> Color:
-        return cls(1, 0, 0)
+        return cls(1.0, 0.0, 0.0)
     
     @classmethod
     def GREEN(cls) -> Color:
-        return cls(0, 1, 0)
+        return cls(0.0, 1.0, 0.0)
     
     @classmethod
     def BLUE(cls) -> Color:
-        return cls(0, 0, 1)
+        return cls(0.0, 0.0, 1.0)
     
\ No newline at end of file
@@ -1,10 +1,12 @@
 from __future__ import annotations
 import typing as t
 
+from math import inf
+
 from .color import Color
 from .skybox import SkyBox, Lerp
-from .assets.hittable import HitRecord, Interval, BVHNode
-from .vec3 import Vector3
+from .assets.hittable import HitRecord, HittableList, Interval
+from .bvh import FlatBVH
 from .ray import Ray
 
 if t.TYPE_CHECKING:
@@ -15,11 +17,22 @@ if t.TYPE_CHECKING:
 _MIN_INTERVAL_DIFFERENCE = 0.001
 
 class Scene(object):
-    """A collection of hittable objects and a skybox that can be rendered with a camera"""
+    """A collection of hittable objects and a skybox that can be rendered with a camera
+    
+    The assets are compiled into a hierarchy before rendering and only compiled again
+    once the scene is marked dirty. Scene.add_asset(), Scene.set_asset_attr() and
+    Scene.clear() do this, after changing Scene.assets or an asset's attributes
+    directly call refresh() on any changed asset and then Scene.invalidate()
+    """
     
     assets: list[Hittable]
     skybox: SkyBox
     
+    # Compiled hierarchy over the assets, regenerated
+    # by Scene.compile() whenever the scene is dirty
+    _dirty: bool
+    _bvh: FlatBVH
+    
     def __init__(self, assets: list[Hittable], skybox: SkyBox = Lerp(Color(0.7, 0.5, 1.0), Color(1.0, 1.0, 1.0))) -> None:
         """Creates a list of hittable objects
 
@@ -28,6 +41,7 @@ class Scene(object):
             skybox (SkyBox, optional): The skybox object that calculates a color for rays that don't hit anything. Defaults to Lerp(Color(0.7, 0.5, 1.0), Color(1.0, 1.0, 1.0)).
         """
         self.assets = []
+        self._dirty = True
         for asset in assets:
             self.add_asset(asset)
         self.skybox = skybox
@@ -45,11 +59,54 @@ class Scene(object):
             asset (Hittable): Asset to add to scene
         """
         self.assets.append(asset)
+        self._dirty = True
         
     
+    def set_asset_attr(self, index: int, name: str, value: t.Any) -> None:
+        """Changes an attribute of an asset in this scene, marking the scene
+        to be recompiled before it is next rendered
+
+        Args:
+            index (int): The index of the asset in this scene
+            name (str): The name of the attribute to change
+            value (t.Any): The new value of the attribute
+        """
+        self.assets[index].set_attr(name, value)
+        self._dirty = True
+    
     def clear(self) -> t.NoReturn:
         """Clears this scene removing all assets"""
         self.assets = []
+        self._dirty = True
+    
+    def invalidate(self) -> None:
+        """Marks this scene to be recompiled before it is next rendered, this must be
+        called after changing Scene.assets or the attributes of an asset directly
+        """
+        self._dirty = True
+    
+    def compile(self) -> None:
+        """Builds a flattened Bounding Volume Hierarchy over the assets of this scene,
+        leaves of the hierarchy pack spheres, triangles and quads into records of the 
+        floats their hit tests read and store every other asset as is.
+        
+        Only does work when the scene has changed since the last compile, the camera
+        calls this once before rendering.
+        """
+        if not self._dirty:
+            return
+        
+        # Nested lists build their own hierarchies here, before the scene is copied
+        # out to any render workers. Lists within lists are walked as well
+        pending = list(self.assets)
+        while pending:
+            asset = pending.pop()
+            if isinstance(asset, HittableList):
+                asset.finalize()
+                pending.extend(asset.assets)
+        
+        self._bvh = FlatBVH(self.assets)
+        self._dirty = False
     
     def hit(self, r: Ray, ray_t: Interval, rec: HitRecord) -> bool:
         """Returns True if Ray r hits any object in the scene and saves the closest hit
@@ -58,29 +115,23 @@ class Scene(object):
         Args:
             r (Ray): Ray to check
             ray_t (Interval): Interval to check
-            rec (HitRecord): _description_
+            rec (HitRecord): The record to save the closest hit to
 
         Returns:
-            bool: _description_
+            bool: If any object in the scene was hit
         """
-        temp_rec = HitRecord()
-        hit_anything = False
+        if self._dirty:
+            self.compile()
         
-        for asset in self.assets:
-            if asset.hit(r, ray_t, temp_rec):
-                hit_anything = True
-                ray_t.max = temp_rec.t
-                rec.copy_data(temp_rec) # Copy all data into temp_rec
-        
-        return hit_anything
+        return self._bvh.hit(r, ray_t, rec)
     
     def r_ray_color(self, r: Ray, rec: HitRecord, limit: int, depth: int = 0) -> Color:
-        """A recursive copy of ray_color() that doesnt increase memory consumption
-        and implements a bounce limit.
+        """The recursive form of ray_color(), kept for compatibility. Rays are followed
+        by the loop in ray_color() with the same bounce limit
 
         Args:
             r (Ray): A ray cast through this scene
-            rec (HitRecord): An already created and populated HitRecord
+            rec (HitRecord): Unused, ray_color() keeps its own record
             limit (int): The bounce limit set by a camera object
             depth (int, optional): The current depth of the ray, to limit bounces. Defaults to 0.
 
@@ -88,20 +139,10 @@ class Scene(object):
             Color: The color of the ray.
         """
         if limit < depth:
-            return Color(0, 0, 0)
+            return Color(0.0, 0.0, 0.0)
         
-        if self.hit(r, Interval(_MIN_INTERVAL_DIFFERENCE), rec):
-            scattered = Ray(None, None)
-            attenuation = Color(0, 0, 0)
-            from_emission = rec.mat.emitted(rec.u, rec.v, rec.p)
-            
-            if not rec.mat.scatter(r, rec, attenuation, scattered):
-                return from_emission
-            
-            from_scatter = attenuation * self.r_ray_color(scattered, rec, limit, depth + 1)
-            return from_scatter + from_emission
-        
-        return self.skybox.get_color(r)
+        # ray_color() allows limit + 2 hits, this allows one for every depth up to the limit
+        return self.ray_color(r, limit - depth - 1)
     
     def ray_color(self, r: Ray, limit: int) -> Color:
         """Propogates a ray through this scene and returns the color 
@@ -113,17 +154,49 @@ class Scene(object):
         Returns:
             Color: The output color of Ray r
         """
+        # The compiled hierarchy is hit directly, skipping the dirty
+        # check and extra call of Scene.hit() on every bounce
+        if self._dirty:
+            self.compile()
+        hit = self._bvh.hit
+        
         rec = HitRecord()
+        ray_t = Interval(_MIN_INTERVAL_DIFFERENCE)
+        attenuation = Color(0.0, 0.0, 0.0)
+        # Two rays are swapped between bounces so the ray passed in is never written to
+        scattered, spare = Ray(None, None), Ray(None, None)
+        
+        # Light gathered along the path so far, and how much of the
+        # light found at the next hit still reaches the camera
+        red, green, blue = 0.0, 0.0, 0.0
+        through_r, through_g, through_b = 1.0, 1.0, 1.0
         
-        if self.hit(r, Interval(_MIN_INTERVAL_DIFFERENCE), rec):
-            scattered = Ray(None, None)
-            attenuation = Color(0, 0, 0)
-            from_emission = rec.mat.emitted(rec.u, rec.v, rec.p)
+        # Bounces are followed in a loop instead of recursing once per bounce,
+        # the first hit plus limit + 1 scattered hits are allowed before the
+        # path is cut off and gathers no more light
+        for _ in range(limit + 2):
+            # A hit shrinks the interval to the closest distance, so it is reset
+            ray_t.max = inf
+            if not hit(r, ray_t, rec):
+                sky = self.skybox.get_color(r)
+                return Color(red + through_r * sky.x, green + through_g * sky.y, blue + through_b * sky.z)
+            
+            # Material flags skip the calls that would return nothing,
+            # most materials never emit and lights never scatter
+            mat = rec.mat
+            if mat.emits:
+                emission = mat.emitted(rec.u, rec.v, rec.p)
+                red += through_r * emission.x
+                green += through_g * emission.y
+                blue += through_b * emission.z
+            
+            if not (mat.scatters and mat.scatter(r, rec, attenuation, scattered)):
+                break
             
-            if not rec.mat.scatter(r, rec, attenuation, scattered):
-                return from_emission
+            through_r *= attenuation.x
+            through_g *= attenuation.y
+            through_b *= attenuation.z
             
-            from_scatter = attenuation * self.r_ray_color(scattered, rec, limit)
-            return from_scatter + from_emission
+            r, scattered, spare = scattered, spare, scattered
         
-        return self.skybox.get_color(r)
\ No newline at end of file
+        return Color(red, green, blue)
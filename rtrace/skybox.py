@@ -61,7 +61,7 @@ class Lerp(SkyBox):
     def get_color(self, r: Ray) -> Color:
         unit_direction = r.direction.unit_vector
         a = 0.5*(unit_direction.y + 1.0)
-        return (1.0-a) * self.c2 + a * self.c1
+        return self.c2.mul_scalar(1.0-a) + self.c1.mul_scalar(a)
 
 class Mono(SkyBox):
     """A skybox that returns a single color"""
@@ -135,7 +135,7 @@ class Textured(SkyBox):
             (int(u * w + ox)) % w, 
             -(int(v * h - oy)) % h
         ))
-        return self._color_handle(albedo) * self.mul
+        return self._color_handle(albedo).mul_scalar(self.mul)
         
     
     @staticmethod
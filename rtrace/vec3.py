@@ -5,6 +5,10 @@ from random import uniform
 
 class Vector3(object):
     """A vector object in 3D space, usually a direction"""
+    
+    # Fixed storage for the three components, removes the per
+    # instance __dict__ that every arithmetic result would allocate
+    __slots__ = ("x", "y", "z")
 
     x: float
     y: float
@@ -99,6 +103,12 @@ class Vector3(object):
         s = 1e-8 # A very small constant
         return (abs(self.x) < s) and (abs(self.y) < s) and (abs(self.z) < s)
     
+    @property
+    def as_floats(self) -> Vector3:
+        """Returns a new vector of the same class with every component as a float,
+        math between two floats runs faster than math mixing ints and floats"""
+        return self.__class__(float(self.x), float(self.y), float(self.z))
+    
     @classmethod
     def dot(cls, v1: Vector3, v2: Vector3) -> float:
         """Take the dot product of two vectors
@@ -188,7 +198,7 @@ class Vector3(object):
             Vector3: A random vector on a disc
         """
         while True:
-            p = Vector3(uniform(-1, 1), uniform(-1, 1), 0)
+            p = Vector3(uniform(-1, 1), uniform(-1, 1), 0.0)
             if p.length_squared < 1:
                 return p
     
@@ -203,7 +213,7 @@ class Vector3(object):
         Returns:
             Vector3: The reflected vector
         """
-        return v - (2 * Vector3.dot(v, n) * n)
+        return v - (2.0 * Vector3.dot(v, n) * n)
     
     @classmethod
     def refract(cls, uv: Vector3, n: Vector3, etai_over_etat: float) -> Vector3:
@@ -225,4 +235,4 @@ class Vector3(object):
 
 class Point3(Vector3):
     """The exact same as a vector3 internally, just represents a point in 3D space."""
-    pass # Exists just for readability
\ No newline at end of file
+    __slots__ = () # Exists just for readability
\ No newline at end of file
@@ -0,0 +1,35 @@
+import io
+import unittest
+
+from PIL import Image
+
+from rtrace import Camera, Scene, Point3, Color, Assets, Mat
+
+
+class TestSphere(unittest.TestCase):
+
+    def test_zero_radius_builds(self):
+        sphere = Assets.Sphere(Point3(0, 0, -1), 0, Mat.Lambertian(Color.GRAY()))
+        self.assertEqual(sphere.radius_sq, 0.0)
+        self.assertEqual(sphere.inv_radius, 0.0)
+
+    def test_zero_radius_set_attr(self):
+        sphere = Assets.Sphere(Point3(0, 0, -1), 0.5, Mat.Lambertian(Color.GRAY()))
+        sphere.set_attr("radius", 0)
+        self.assertEqual(sphere.inv_radius, 0.0)
+
+    def test_zero_radius_renders(self):
+        scene = Scene([
+            Assets.Sphere(Point3(0, 0, -1), 0, Mat.Lambertian(Color.GRAY())),
+            Assets.Sphere(Point3(0, -100.5, -1), 100, Mat.Lambertian(Color.GRAY())),
+        ])
+        cam = Camera(16, 16 / 9, Point3(0, 0, 0), Point3(0, 0, -1), samples=2, use_multiprocess=False)
+        
+        out = io.BytesIO()
+        cam.render(scene, out, silent=True)
+        out.seek(0)
+        self.assertEqual(Image.open(out).size, (cam.img_width, cam.img_height))
+
+
+if __name__ == "__main__":
+    unittest.main()